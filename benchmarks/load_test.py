@@ -0,0 +1,285 @@
+#!/usr/bin/env python3
+"""
+Concurrent multi-user load generator for ManagerAIGraph.
+
+Simulates N users, each running a randomized dialogue against one in-process graph
+backed by the stub model (or a replayed cassette), and ramps N to find where
+throughput stops scaling:
+
+    python benchmarks/load_test.py --levels 1,2,4,8,16,32 --turns 5 --latency 0.4
+    python benchmarks/load_test.py --cassette runs/demo.jsonl --latency-scale 1.0
+    python benchmarks/load_test.py --processes 4 --latency 0   # CPU-bound scaling over cores
+"""
+
+import argparse
+import contextlib
+import functools
+import gc
+import io
+import json
+import os
+import random
+import statistics
+import sys
+import threading
+import time
+import tracemalloc
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from langchain_core.messages import HumanMessage
+
+from src.config.settings import MEMORY_SPILL_DIR
+from src.graph.manager_graph import ManagerAIGraph
+from src.harness.cassette import Cassette
+from src.harness.stub_model import StubChatModel, stub_search_tools
+from src.memory.versioned import write_stats
+from src.serving.worker_pool import WorkerPool, worker_spill_dir
+from src.tools.search_tools import search_execution_tools
+
+
+# Utterance templates per intent, in the spirit of examples/example_usage.py
+TEMPLATES = {
+    "profile": [
+        "My name is {name}, I'm a {role} in {city}.",
+        "Actually, I should update that - I'm now working remotely from {city}.",
+        "I work on the {team} team as a {role}.",
+    ],
+    "ticket": [
+        "Create a ticket to {verb} {object}.",
+        "Add another task to {verb} {object} by {day}.",
+        "Please create a ticket to {verb} {object} before the {team} review.",
+    ],
+    "search": [
+        "Find recent information about {topic}.",
+        "Search for the latest trends in {topic}.",
+    ],
+    "feedback": [
+        "Add feedback that users want {feature}.",
+        "Customers say the {feature} is confusing, add that feedback.",
+    ],
+    "research": [
+        "Add to our research notes that {competitor} launched {feature}.",
+    ],
+    "instructions": [
+        "From now on, always include deadlines in tickets.",
+        "I prefer tickets with at most three solutions.",
+    ],
+    "chat": [
+        "What should I focus on this week?",
+        "Thanks, that's all for now.",
+    ],
+}
+DEFAULT_MIX = {"profile": 1, "ticket": 4, "search": 2, "feedback": 1, "research": 1, "instructions": 1, "chat": 2}
+
+VOCABULARY = {
+    "name": ["Alice Johnson", "Sarah Lee", "Raj Patel", "Tom Becker", "Mina Okafor"],
+    "role": ["product manager", "engineering manager", "CEO", "program manager"],
+    "city": ["Seattle", "London", "San Francisco", "Berlin", "Bangalore"],
+    "team": ["platform", "growth", "mobile", "payments"],
+    "verb": ["research", "review", "draft", "schedule", "investigate", "prioritize"],
+    "object": ["competitor pricing strategies", "quarterly team reviews", "new CRM options",
+               "the onboarding funnel", "Q3 roadmap", "vendor contracts"],
+    "day": ["Friday", "next Monday", "end of month"],
+    "topic": ["remote work productivity studies", "product management methodologies",
+              "AI in project management", "B2B pricing models"],
+    "feature": ["a better mobile experience", "dark mode", "faster exports", "SSO support"],
+    "competitor": ["Acme", "Globex", "Initech"],
+}
+
+
+def make_script(rng, turns, mix):
+    intents, weights = zip(*mix.items())
+    script = []
+    for _ in range(turns):
+        template = rng.choice(TEMPLATES[rng.choices(intents, weights)[0]])
+        script.append(template.format(**{k: rng.choice(v) for k, v in VOCABULARY.items()}))
+    return script
+
+
+def percentile(values, pct):
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, int(round(pct / 100 * (len(ordered) - 1)))))
+    return ordered[index]
+
+
+def make_graph(cassette_path, latency_scale, latency, search_latency, sigma, seed, worker_id=None):
+    # Pool workers each get their own spill subdirectory
+    spill_dir = worker_spill_dir(worker_id) if worker_id is not None else MEMORY_SPILL_DIR
+    if cassette_path:
+        cassette = Cassette(cassette_path, latency_scale=latency_scale, loop=True)
+        return ManagerAIGraph(snapshot_path=None, cassette=cassette, spill_dir=spill_dir)
+    model = StubChatModel(latency_median=latency, latency_sigma=sigma, seed=seed)
+    tools = stub_search_tools(search_execution_tools, search_latency, sigma, seed=seed)
+    return ManagerAIGraph(snapshot_path=None, cassette=None, model=model, search_tools=tools, spill_dir=spill_dir)
+
+
+def graph_factory(args):
+    return functools.partial(make_graph, args.cassette, args.latency_scale, args.latency,
+                             args.search_latency, args.sigma, args.seed)
+
+
+class PoolTarget:
+    """Runs turns on a sharded WorkerPool instead of an in-process graph."""
+
+    def __init__(self, args):
+        self.pool = WorkerPool(args.processes, graph_factory=graph_factory(args), threads_per_worker=args.workers)
+
+    def invoke(self, input_data, config):
+        configurable = config["configurable"]
+        message = input_data["messages"][-1].content
+        return self.pool.invoke(configurable["user_id"], configurable["thread_id"], message)
+
+    def close(self):
+        self.pool.close()
+
+
+def run_level(args, users, mix):
+    """Run `users` closed-loop users against a fresh graph; returns the level's metrics."""
+    ai_graph = PoolTarget(args) if args.processes else graph_factory(args)()
+    # With worker processes, each worker runs `--workers` turns at once
+    executor = ThreadPoolExecutor(max_workers=args.workers * max(1, args.processes))
+    lock = threading.Lock()
+    latencies, queue_delays, errors = [], [], []
+
+    def execute(message, config, submitted):
+        started = time.perf_counter()
+        ai_graph.invoke({"messages": [HumanMessage(content=message)]}, config)
+        return started - submitted, time.perf_counter() - submitted
+
+    def user_loop(index):
+        rng = random.Random(f"{args.seed}-{users}-{index}")
+        config = {"configurable": {"thread_id": f"load-{index}", "user_id": f"load-user-{index}"}}
+        for message in make_script(rng, args.turns, mix):
+            try:
+                queue_delay, latency = executor.submit(execute, message, config, time.perf_counter()).result()
+                with lock:
+                    queue_delays.append(queue_delay)
+                    latencies.append(latency)
+            except Exception as e:
+                with lock:
+                    errors.append(repr(e))
+            if args.think_time > 0:
+                time.sleep(rng.expovariate(1 / args.think_time))
+
+    write_stats.reset()
+    gc.collect()
+    if args.trace_memory:
+        tracemalloc.start()
+    memory_before = tracemalloc.get_traced_memory()[0] if args.trace_memory else 0
+
+    started = time.perf_counter()
+    # Nodes print whole prompts; keep that off the terminal but still pay for it
+    with contextlib.redirect_stdout(io.StringIO()):
+        threads = [threading.Thread(target=user_loop, args=(i,)) for i in range(users)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+    elapsed = time.perf_counter() - started
+    executor.shutdown()
+    if args.processes:
+        ai_graph.close()
+
+    memory_growth = 0
+    if args.trace_memory:
+        gc.collect()
+        memory_growth = tracemalloc.get_traced_memory()[0] - memory_before
+        tracemalloc.stop()
+
+    return {
+        "users": users,
+        "turns": len(latencies),
+        "errors": len(errors),
+        "seconds": elapsed,
+        "throughput": len(latencies) / elapsed if elapsed else 0.0,
+        "p50": percentile(latencies, 50),
+        "p95": percentile(latencies, 95),
+        "p99": percentile(latencies, 99),
+        "queue_p50": percentile(queue_delays, 50),
+        "queue_p95": percentile(queue_delays, 95),
+        "queue_mean": statistics.fmean(queue_delays) if queue_delays else 0.0,
+        "memory_per_user_kb": memory_growth / users / 1024,
+        # Memory writes that lost a compare-and-set race (in-process runs only)
+        "write_conflict_rate": write_stats.conflict_rate(),
+        "first_error": errors[0] if errors else None,
+    }
+
+
+def find_saturation(results, min_gain):
+    """First level whose throughput gain over the previous level is below `min_gain`."""
+    for previous, current in zip(results, results[1:]):
+        if current["throughput"] < previous["throughput"] * (1 + min_gain):
+            return previous["users"]
+    return None
+
+
+def print_report(results, saturation):
+    header = (f"{'users':>6} {'turns/s':>9} {'p50 s':>8} {'p95 s':>8} {'p99 s':>8} "
+              f"{'queue p50':>10} {'queue p95':>10} {'KB/user':>9} {'conflicts':>10} {'errors':>7}")
+    print(header)
+    print("-" * len(header))
+    for r in results:
+        print(f"{r['users']:>6} {r['throughput']:>9.2f} {r['p50']:>8.3f} {r['p95']:>8.3f} {r['p99']:>8.3f} "
+              f"{r['queue_p50']:>10.3f} {r['queue_p95']:>10.3f} {r['memory_per_user_kb']:>9.1f} {r['write_conflict_rate']:>10.1%} {r['errors']:>7}")
+    if saturation:
+        print(f"\nThroughput saturates at ~{saturation} concurrent users.")
+    else:
+        print("\nThroughput was still scaling at the highest level tested.")
+    for r in results:
+        if r["first_error"]:
+            print(f"First error at {r['users']} users: {r['first_error']}")
+            break
+
+
+def parse_mix(text):
+    mix = dict(DEFAULT_MIX)
+    if text:
+        for part in text.split(","):
+            intent, weight = part.split("=")
+            if intent not in TEMPLATES:
+                raise SystemExit(f"Unknown intent '{intent}', expected one of {sorted(TEMPLATES)}")
+            mix[intent] = float(weight)
+    return mix
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--levels", default="1,2,4,8,16,32", help="Comma-separated concurrent user counts")
+    parser.add_argument("--turns", type=int, default=5, help="Turns per user at each level")
+    parser.add_argument("--workers", type=int, default=16, help="Turns the process executes at once")
+    parser.add_argument("--processes", type=int, default=0,
+                        help="Shard users over this many worker processes (0 = run in-process)")
+    parser.add_argument("--think-time", type=float, default=0.0, help="Mean seconds between a user's turns")
+    parser.add_argument("--latency", type=float, default=0.3, help="Stub model median latency (seconds)")
+    parser.add_argument("--search-latency", type=float, default=0.8, help="Stub search median latency (seconds)")
+    parser.add_argument("--sigma", type=float, default=0.5, help="Log-normal sigma for stub latencies")
+    parser.add_argument("--cassette", help="Replay this cassette instead of using the stub model")
+    parser.add_argument("--latency-scale", type=float, default=1.0, help="Replay latency multiplier")
+    parser.add_argument("--mix", help="Intent weights, e.g. ticket=4,search=2,chat=1")
+    parser.add_argument("--saturation-gain", type=float, default=0.1,
+                        help="Throughput gain below which a level counts as saturated")
+    parser.add_argument("--no-trace-memory", dest="trace_memory", action="store_false",
+                        help="Skip tracemalloc (it slows every allocation)")
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--out", help="Write results as JSON")
+    args = parser.parse_args()
+
+    mix = parse_mix(args.mix)
+    results = []
+    for users in [int(level) for level in args.levels.split(",")]:
+        print(f"Running {users} concurrent user(s)...", file=sys.stderr)
+        results.append(run_level(args, users, mix))
+
+    saturation = find_saturation(results, args.saturation_gain)
+    print_report(results, saturation)
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump({"levels": results, "saturation_users": saturation}, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""
+Show that resident memory follows active users, not total users, with tiered memory.
+
+For each population size, every user holds a short conversation once, then a small
+active set keeps talking. Resident memory (tracemalloc) is measured at the end, with
+and without a spill directory, along with eviction and reload latency:
+
+    python benchmarks/memory_tiering.py --populations 50,200,600 --active 20 --cap-mb 2
+"""
+
+import argparse
+import contextlib
+import gc
+import io
+import json
+import os
+import random
+import shutil
+import sys
+import tempfile
+import tracemalloc
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from langchain_core.messages import HumanMessage
+
+from load_test import DEFAULT_MIX, make_script
+from src.graph.manager_graph import ManagerAIGraph
+from src.harness.stub_model import StubChatModel, stub_search_tools
+from src.tools.search_tools import search_execution_tools
+
+
+def run(population, args, tiered):
+    spill_dir = tempfile.mkdtemp(prefix="manager-ai-spill-") if tiered else None
+    gc.collect()
+    tracemalloc.start()
+    model = StubChatModel(latency_median=0, latency_sigma=0, seed=args.seed)
+    tools = stub_search_tools(search_execution_tools, 0, 0, seed=args.seed)
+    ai_graph = ManagerAIGraph(snapshot_path=None, cassette=None, model=model, search_tools=tools,
+                              spill_dir=spill_dir, memory_cap_bytes=int(args.cap_mb * 2**20))
+
+    rng = random.Random(args.seed)
+
+    def turn(user, message):
+        config = {"configurable": {"thread_id": f"{user}-thread", "user_id": user}}
+        ai_graph.invoke({"messages": [HumanMessage(content=message)]}, config)
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        for i in range(population):
+            for message in make_script(rng, args.turns, DEFAULT_MIX):
+                turn(f"user-{i}", message)
+        # A small active set keeps talking; everyone else goes idle
+        for _ in range(args.active_rounds):
+            for i in rng.sample(range(population), min(args.active, population)):
+                turn(f"user-{i}", make_script(rng, 1, DEFAULT_MIX)[0])
+
+    gc.collect()
+    resident = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    stats = ai_graph.tiered_memory.stats() if tiered else {}
+    if spill_dir:
+        shutil.rmtree(spill_dir, ignore_errors=True)
+    return {"population": population, "tiered": tiered, "resident_mb": resident / 2**20, **stats}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--populations", default="50,200,600", help="Comma-separated total user counts")
+    parser.add_argument("--active", type=int, default=20, help="Users still active after the first pass")
+    parser.add_argument("--active-rounds", type=int, default=5)
+    parser.add_argument("--turns", type=int, default=3, help="Turns per user in the first pass")
+    parser.add_argument("--cap-mb", type=float, default=2.0, help="Resident memory cap for tiered runs")
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--out", help="Write results as JSON")
+    args = parser.parse_args()
+
+    results = []
+    for population in [int(p) for p in args.populations.split(",")]:
+        for tiered in (False, True):
+            print(f"Running {population} users ({'tiered' if tiered else 'all in RAM'})...", file=sys.stderr)
+            results.append(run(population, args, tiered))
+
+    print(f"{'users':>6} {'mode':<10} {'resident MB':>12} {'resident':>9} {'spilled':>8} "
+          f"{'evict p50/p99 ms':>17} {'reload p50/p99 ms':>18}")
+    for r in results:
+        if r["tiered"]:
+            print(f"{r['population']:>6} {'tiered':<10} {r['resident_mb']:>12.1f} {r['resident_users']:>9} "
+                  f"{r['spilled_users']:>8} {r['evict_p50_ms']:>8.2f}/{r['evict_p99_ms']:<8.2f} "
+                  f"{r['reload_p50_ms']:>9.2f}/{r['reload_p99_ms']:<8.2f}")
+        else:
+            print(f"{r['population']:>6} {'in RAM':<10} {r['resident_mb']:>12.1f} {r['population']:>9} {0:>8}")
+
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
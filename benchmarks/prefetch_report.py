@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""
+Measure speculative search prefetch: hit rate and research-turn latency saved.
+
+Runs the same dialogues with and without prefetch, using the stub model and stub
+search tools with realistic latencies (so the overlap of search and model time is real):
+
+    python benchmarks/prefetch_report.py --turns 40 --latency 0.6 --search-latency 0.8
+"""
+
+import argparse
+import contextlib
+import io
+import os
+import random
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from langchain_core.messages import HumanMessage
+
+from load_test import DEFAULT_MIX, TEMPLATES, make_script, percentile
+from src.graph.manager_graph import ManagerAIGraph
+from src.harness.stub_model import StubChatModel, stub_search_tools
+from src.tools.search_tools import search_execution_tools
+
+
+def run(args, prefetch):
+    model = StubChatModel(latency_median=args.latency, latency_sigma=args.sigma, seed=args.seed)
+    tools = stub_search_tools(search_execution_tools, args.search_latency, args.sigma, seed=args.seed)
+    ai_graph = ManagerAIGraph(snapshot_path=None, cassette=None, model=model, search_tools=tools,
+                              search_prefetch=prefetch)
+    search_templates = set(TEMPLATES["search"])
+
+    rng = random.Random(args.seed)
+    mix = dict(DEFAULT_MIX, search=args.search_weight)
+    config = {"configurable": {"thread_id": "prefetch-thread", "user_id": "prefetch-user"}}
+    latencies = {"search": [], "other": []}
+    with contextlib.redirect_stdout(io.StringIO()):
+        for message in make_script(rng, args.turns, mix):
+            started = time.perf_counter()
+            ai_graph.invoke({"messages": [HumanMessage(content=message)]}, config)
+            is_search = any(message.startswith(t.split("{")[0]) for t in search_templates)
+            latencies["search" if is_search else "other"].append(time.perf_counter() - started)
+
+    stats = ai_graph.prefetcher.stats() if ai_graph.prefetcher else {}
+    ai_graph.close()
+    return latencies, stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--turns", type=int, default=40)
+    parser.add_argument("--search-weight", type=float, default=4, help="Weight of search turns in the mix")
+    parser.add_argument("--latency", type=float, default=0.6, help="Stub model median latency (seconds)")
+    parser.add_argument("--search-latency", type=float, default=0.8, help="Stub search median latency (seconds)")
+    parser.add_argument("--sigma", type=float, default=0.3)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    results = {}
+    for prefetch in (False, True):
+        print(f"Running {'with' if prefetch else 'without'} prefetch...", file=sys.stderr)
+        results[prefetch] = run(args, prefetch)
+
+    print(f"{'':<18} {'search turns':>13} {'p50 s':>7} {'mean s':>7}   {'other turns':>12} {'p50 s':>7}")
+    for prefetch, (latencies, _) in results.items():
+        search, other = latencies["search"], latencies["other"]
+        print(f"{'prefetch' if prefetch else 'no prefetch':<18} {len(search):>13} {percentile(search, 50):>7.3f} "
+              f"{statistics.fmean(search) if search else 0:>7.3f}   {len(other):>12} {percentile(other, 50):>7.3f}")
+
+    stats = results[True][1]
+    print(f"\nPrefetches started: {stats.get('started', 0)}  hits: {stats.get('hit', 0)}  "
+          f"missed: {stats.get('missed', 0)}  unused: {stats.get('unused', 0)}")
+    print(f"Hit rate: {stats['hit_rate']:.1%}  latency saved: {stats['saved_seconds']:.2f}s total, "
+          f"{stats['saved_per_hit']:.3f}s per hit")
+
+
+if __name__ == "__main__":
+    main()
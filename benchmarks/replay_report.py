@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+"""
+Record or replay a scripted dialogue and report per-node timings and token usage.
+
+Record once against the live APIs, then replay offline on any commit and compare:
+
+    python benchmarks/replay_report.py record --cassette runs/demo.jsonl --out runs/base.json
+    python benchmarks/replay_report.py replay --cassette runs/demo.jsonl --out runs/new.json --compare runs/base.json
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+from collections import defaultdict
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from langchain_core.messages import HumanMessage
+
+from src.graph.manager_graph import ManagerAIGraph
+from src.harness.cassette import Cassette, RECORD
+
+
+DEFAULT_DIALOGUE = [
+    "My name is Alice Johnson, I'm a product manager in San Francisco.",
+    "Create a ticket to research competitor pricing strategies.",
+    "Add another task to schedule quarterly team reviews.",
+    "Find recent information about remote work productivity studies.",
+    "Add feedback that users want a better mobile experience.",
+]
+
+
+def run_dialogue(ai_graph, dialogue, user_id="replay_user"):
+    """Run the dialogue turn by turn, timing each node from the graph's update stream."""
+    config = {"configurable": {"thread_id": f"{user_id}-thread", "user_id": user_id}}
+    node_times = defaultdict(list)
+    turn_times = []
+
+    for message in dialogue:
+        turn_started = last = time.perf_counter()
+        for update in ai_graph.stream({"messages": [HumanMessage(content=message)]}, config, stream_mode="updates"):
+            now = time.perf_counter()
+            for node in update:
+                node_times[node].append(now - last)
+            last = now
+        turn_times.append(time.perf_counter() - turn_started)
+
+    return node_times, turn_times
+
+
+def build_report(cassette, node_times, turn_times):
+    return {
+        "turns": len(turn_times),
+        "turn_seconds": sum(turn_times),
+        "nodes": {
+            node: {"calls": len(times), "seconds": sum(times), "mean_seconds": sum(times) / len(times)}
+            for node, times in node_times.items()
+        },
+        "interactions": cassette.summary(),
+        "drift": cassette.drift,
+    }
+
+
+def print_report(report, baseline=None):
+    print(f"Turns: {report['turns']}  total: {report['turn_seconds']:.3f}s")
+    print("\nNode timings:")
+    for node, stats in sorted(report["nodes"].items()):
+        line = f"  {node:<26} calls={stats['calls']:<4} total={stats['seconds']:.4f}s"
+        if baseline and node in baseline["nodes"]:
+            line += f"  (baseline {baseline['nodes'][node]['seconds']:.4f}s)"
+        print(line)
+
+    print("\nLLM / tool interactions (as recorded):")
+    for label, stats in sorted(report["interactions"].items()):
+        line = (f"  {label:<26} calls={int(stats['calls']):<4} "
+                f"tokens={int(stats.get('total_tokens', 0)):<7} recorded={stats['elapsed']:.3f}s")
+        if baseline and label in baseline["interactions"]:
+            delta = stats.get("total_tokens", 0) - baseline["interactions"][label].get("total_tokens", 0)
+            line += f"  (tokens {delta:+.0f} vs baseline)"
+        print(line)
+
+    if report["drift"]:
+        print(f"\nPrompt drift: {len(report['drift'])} request(s) no longer match the cassette")
+        for drift in report["drift"]:
+            print(f"--- {drift['label']}\n{drift['diff']}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("mode", choices=["record", "replay"])
+    parser.add_argument("--cassette", required=True)
+    parser.add_argument("--dialogue", help="Text file with one user message per line")
+    parser.add_argument("--latency-scale", type=float, default=0.0,
+                        help="Replay with recorded latencies multiplied by this factor")
+    parser.add_argument("--strict", action="store_true", help="Fail on the first prompt drift")
+    parser.add_argument("--out", help="Write the JSON report here")
+    parser.add_argument("--compare", help="Baseline JSON report to compare against")
+    args = parser.parse_args()
+
+    dialogue = DEFAULT_DIALOGUE
+    if args.dialogue:
+        with open(args.dialogue, "r", encoding="utf-8") as f:
+            dialogue = [line.strip() for line in f if line.strip()]
+
+    if args.mode == RECORD:
+        from src.config.settings import setup_environment
+        setup_environment()
+        if os.path.exists(args.cassette):
+            os.remove(args.cassette)
+
+    cassette = Cassette(args.cassette, mode=args.mode, latency_scale=args.latency_scale, strict=args.strict)
+    ai_graph = ManagerAIGraph(snapshot_path=None, cassette=cassette)
+    node_times, turn_times = run_dialogue(ai_graph, dialogue)
+    report = build_report(cassette, node_times, turn_times)
+
+    baseline = None
+    if args.compare:
+        with open(args.compare, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+    print_report(report, baseline)
+
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""
+Live users competing with a bulk extraction job for a fixed LLM concurrency budget.
+
+Runs the same interactive load three ways, with the stub model's latency standing in
+for provider time: alone, next to the bulk job with first-come-first-served admission,
+and next to the bulk job with the priority scheduler. Reports interactive turn latency
+and queue time per priority class:
+
+    python benchmarks/scheduler_report.py --budget 4 --users 8 --bulk-workers 16 --latency 0.2
+"""
+
+import argparse
+import contextlib
+import io
+import os
+import random
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from langchain_core.messages import HumanMessage, SystemMessage
+
+from load_test import DEFAULT_MIX, make_script, percentile
+from src.graph.manager_graph import ManagerAIGraph
+from src.harness.stub_model import StubChatModel, stub_search_tools
+from src.models.scheduler import BULK, PRIORITY_CLASSES, LLMScheduler, llm_priority
+from src.tools.search_tools import search_execution_tools
+
+
+def run(args, with_bulk, fifo):
+    scheduler = LLMScheduler(args.budget, aging_seconds=args.aging, fifo=fifo)
+    model = StubChatModel(latency_median=args.latency, latency_sigma=args.sigma, seed=args.seed)
+    tools = stub_search_tools(search_execution_tools, args.search_latency, args.sigma, seed=args.seed)
+    ai_graph = ManagerAIGraph(snapshot_path=None, cassette=None, model=model, search_tools=tools, scheduler=scheduler)
+
+    stop = threading.Event()
+    bulk_calls, latencies, lock = [0], [], threading.Lock()
+
+    def bulk_worker(index):
+        # e.g. re-extracting tickets from an imported backlog
+        extractor = ai_graph.models["ticket_extractor"]
+        with llm_priority(BULK):
+            while not stop.is_set():
+                extractor.invoke([SystemMessage(content="Extract the ticket."),
+                                  HumanMessage(content=f"Imported backlog item {index}-{bulk_calls[0]}")])
+                with lock:
+                    bulk_calls[0] += 1
+
+    def user_loop(index):
+        rng = random.Random(f"{args.seed}-{index}")
+        config = {"configurable": {"thread_id": f"sched-{index}", "user_id": f"sched-user-{index}"}}
+        for message in make_script(rng, args.turns, DEFAULT_MIX):
+            started = time.perf_counter()
+            ai_graph.invoke({"messages": [HumanMessage(content=message)]}, config)
+            with lock:
+                latencies.append(time.perf_counter() - started)
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        bulk = [threading.Thread(target=bulk_worker, args=(i,), daemon=True)
+                for i in range(args.bulk_workers if with_bulk else 0)]
+        for thread in bulk:
+            thread.start()
+        # Let the bulk job fill the budget before users arrive
+        time.sleep(args.latency * 2 if with_bulk else 0)
+        users = [threading.Thread(target=user_loop, args=(i,)) for i in range(args.users)]
+        for thread in users:
+            thread.start()
+        for thread in users:
+            thread.join()
+        stop.set()
+        for thread in bulk:
+            thread.join()
+
+    return {"turn_p50": percentile(latencies, 50), "turn_p95": percentile(latencies, 95),
+            "bulk_calls": bulk_calls[0], "classes": scheduler.stats.snapshot()}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--budget", type=int, default=4, help="Concurrent LLM calls allowed")
+    parser.add_argument("--users", type=int, default=8)
+    parser.add_argument("--turns", type=int, default=4)
+    parser.add_argument("--bulk-workers", type=int, default=16)
+    parser.add_argument("--latency", type=float, default=0.2, help="Stub model median latency (seconds)")
+    parser.add_argument("--search-latency", type=float, default=0.2)
+    parser.add_argument("--sigma", type=float, default=0.3)
+    parser.add_argument("--aging", type=float, default=10.0, help="Seconds of waiting per class promotion")
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    runs = [("users alone", False, False), ("with bulk, FIFO", True, True), ("with bulk, priority", True, False)]
+    print(f"{'run':<22} {'turn p50 s':>11} {'turn p95 s':>11} {'bulk calls':>11}   queue p50/p95 ms per class")
+    for name, with_bulk, fifo in runs:
+        print(f"Running {name}...", file=sys.stderr)
+        r = run(args, with_bulk, fifo)
+        queues = "  ".join(f"{c}={r['classes'][c]['queue_p50_ms']:.0f}/{r['classes'][c]['queue_p95_ms']:.0f}"
+                           for c in PRIORITY_CLASSES if c in r["classes"])
+        print(f"{name:<22} {r['turn_p50']:>11.3f} {r['turn_p95']:>11.3f} {r['bulk_calls']:>11}   {queues}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+"""
+Benchmark near-duplicate ticket detection on one user with a large backlog.
+
+Indexes N synthetic tickets, then looks up a mix of restated tickets (should merge),
+near misses that swap one word of an existing ticket (should not) and genuinely new
+ones (should not), reporting dedup rate, false merges and lookup time:
+
+    python benchmarks/ticket_dedup_bench.py --tickets 50000 --queries 2000
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import numpy as np
+
+from src.memory.ticket_dedup import TicketIndex
+
+
+VERBS = ["research", "review", "draft", "schedule", "investigate", "prioritize", "prepare", "audit",
+         "migrate", "document", "benchmark", "evaluate", "plan", "negotiate", "update", "fix"]
+SYLLABLES = ["ka", "lo", "mi", "ren", "tor", "vel", "sa", "qu", "bri", "dan", "el", "fo", "gra", "hin",
+             "jo", "ku", "lim", "nor", "pel", "ro", "sti", "tam", "ul", "vin", "wex", "yor", "zen"]
+FILLER = ["please", "asap", "this week", "as discussed", "again", "soon", "if possible"]
+
+
+def make_vocabulary(rng, size):
+    """Synthetic product/customer/project names standing in for a real backlog's nouns."""
+    words = set()
+    while len(words) < size:
+        words.add("".join(rng.choice(SYLLABLES) for _ in range(rng.randint(2, 3))))
+    return sorted(words)
+
+
+def make_ticket(rng, vocabulary):
+    return f"{rng.choice(VERBS)} " + " ".join(rng.sample(vocabulary, rng.randint(4, 6)))
+
+
+def restate(rng, text):
+    """Same task in different words: reordered, pluralized, with filler added."""
+    words = text.split()
+    if rng.random() < 0.5:
+        index = rng.randrange(len(words))
+        words[index] = words[index] + "s"
+    if rng.random() < 0.5:
+        words = words[len(words) // 2:] + words[:len(words) // 2]
+    return "Create a ticket to " + " ".join(words) + " " + rng.choice(FILLER)
+
+
+def near_miss(rng, text, vocabulary):
+    """A different task one word away from an existing one (e.g. another platform or customer)."""
+    words = text.split()
+    index = rng.randrange(1, len(words))
+    words[index] = rng.choice([word for word in vocabulary if word not in words])
+    return " ".join(words)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--tickets", type=int, default=50000)
+    parser.add_argument("--queries", type=int, default=2000)
+    parser.add_argument("--duplicate-share", type=float, default=0.5, help="Share of queries that restate a ticket")
+    parser.add_argument("--near-miss-share", type=float, default=0.25, help="Share of queries one word off a ticket")
+    parser.add_argument("--vocabulary", type=int, default=5000, help="Distinct nouns tickets are built from")
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    vocabulary = make_vocabulary(rng, args.vocabulary)
+    tickets = [make_ticket(rng, vocabulary) for _ in range(args.tickets)]
+
+    index = TicketIndex()
+    started = time.perf_counter()
+    index.add_many((f"t{i}", text) for i, text in enumerate(tickets))
+    build_seconds = time.perf_counter() - started
+
+    lookups, merged, correct, false_merges, duplicates, near_misses, near_miss_merges = [], 0, 0, 0, 0, 0, 0
+    for _ in range(args.queries):
+        draw = rng.random()
+        if draw < args.duplicate_share:
+            target = rng.randrange(args.tickets)
+            query, expected = restate(rng, tickets[target]), f"t{target}"
+            duplicates += 1
+        elif draw < args.duplicate_share + args.near_miss_share:
+            query, expected = near_miss(rng, tickets[rng.randrange(args.tickets)], vocabulary), None
+            near_misses += 1
+        else:
+            query, expected = make_ticket(rng, vocabulary), None
+        started = time.perf_counter()
+        match = index.match(query)
+        lookups.append(time.perf_counter() - started)
+        if match:
+            merged += 1
+            if match[0] == expected:
+                correct += 1
+            elif expected is None:
+                false_merges += 1
+                near_miss_merges += int(draw >= args.duplicate_share)
+
+    lookups_ms = np.array(lookups) * 1000
+    matrix_mb = (index._signatures.nbytes + index._band_keys.nbytes + index._sorted_keys.nbytes
+                 + index._sorted_rows.nbytes) / 2**20
+    print(f"Indexed {len(index)} tickets in {build_seconds:.2f}s ({matrix_mb:.1f} MB of arrays)")
+    distinct = args.queries - duplicates
+    print(f"Queries:          {args.queries} ({duplicates} restated, {near_misses} near misses, "
+          f"{distinct - near_misses} new)")
+    print(f"Dedup rate:       {merged / args.queries:.1%} of queries merged")
+    print(f"Recall:           {correct / duplicates if duplicates else 0:.1%} of restated tickets found")
+    print(f"False merges:     {false_merges / max(1, distinct):.2%} of distinct tickets "
+          f"({near_miss_merges} of {near_misses} near misses)")
+    print(f"Lookup time (ms): p50 {np.percentile(lookups_ms, 50):.3f}  p99 {np.percentile(lookups_ms, 99):.3f}  "
+          f"max {lookups_ms.max():.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""
+Compare latency and token usage of the tiered model assignment against running
+every node on the reasoning model.
+
+    python benchmarks/tier_report.py                       # live Groq calls
+    python benchmarks/tier_report.py --cassette-dir runs   # record both runs...
+    python benchmarks/tier_report.py --cassette-dir runs --replay   # ...and replay them offline
+"""
+
+import argparse
+import contextlib
+import io
+import os
+import sys
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from langchain_core.messages import HumanMessage
+
+from src.config.settings import NODE_MODEL_TIERS, ESCALATION_TIER
+from src.graph.manager_graph import ManagerAIGraph
+from src.harness.cassette import Cassette, RECORD, REPLAY
+from src.models.model_factory import tier_stats
+
+
+DIALOGUE = [
+    "My name is Alice Johnson, I'm a product manager in San Francisco.",
+    "Create a ticket to research competitor pricing strategies.",
+    "Add another task to schedule quarterly team reviews by Friday.",
+    "From now on, always include deadlines in tickets.",
+    "Add feedback that users want a better mobile experience.",
+    "Find recent information about remote work productivity studies.",
+]
+
+
+def run(name, node_tiers, args):
+    cassette = None
+    if args.cassette_dir:
+        path = os.path.join(args.cassette_dir, f"{name}.jsonl")
+        if not args.replay and os.path.exists(path):
+            os.remove(path)
+        cassette = Cassette(path, mode=REPLAY if args.replay else RECORD, latency_scale=1.0 if args.replay else 0.0)
+
+    tier_stats.reset()
+    ai_graph = ManagerAIGraph(snapshot_path=None, cassette=cassette, node_tiers=node_tiers)
+    config = {"configurable": {"thread_id": f"tiers-{name}", "user_id": f"tiers-{name}"}}
+    with contextlib.redirect_stdout(io.StringIO()):
+        for message in DIALOGUE:
+            ai_graph.invoke({"messages": [HumanMessage(content=message)]}, config)
+    return tier_stats.snapshot()
+
+
+def print_stats(name, stats):
+    print(f"\n{name}")
+    print(f"  {'tier/node':<36} {'calls':>6} {'mean s':>8} {'tokens':>8} {'reasoning':>10} {'escalated':>10}")
+    for key in sorted(k for k in stats if "/" in k):
+        s = stats[key]
+        print(f"  {key:<36} {int(s['calls']):>6} {s['seconds'] / s['calls']:>8.3f} "
+              f"{int(s.get('total_tokens', 0)):>8} {int(s.get('reasoning_tokens', 0)):>10} {int(s['escalations']):>10}")
+
+
+def totals(stats):
+    tiers = [stats[k] for k in stats if "/" not in k]
+    return sum(s["seconds"] for s in tiers), sum(s.get("total_tokens", 0) for s in tiers)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--cassette-dir", help="Record the runs here (or replay them with --replay)")
+    parser.add_argument("--replay", action="store_true")
+    args = parser.parse_args()
+
+    if args.cassette_dir:
+        os.makedirs(args.cassette_dir, exist_ok=True)
+    if not args.replay:
+        from src.config.settings import setup_environment
+        setup_environment()
+
+    tiered = run("tiered", None, args)
+    single = run("single_tier", {node: ESCALATION_TIER for node in NODE_MODEL_TIERS}, args)
+
+    print_stats("Tiered (settings.NODE_MODEL_TIERS)", tiered)
+    print_stats(f"Everything on '{ESCALATION_TIER}'", single)
+
+    tiered_seconds, tiered_tokens = totals(tiered)
+    single_seconds, single_tokens = totals(single)
+    print(f"\nModel time: {tiered_seconds:.2f}s tiered vs {single_seconds:.2f}s single tier "
+          f"({tiered_seconds - single_seconds:+.2f}s)")
+    print(f"Tokens:     {int(tiered_tokens)} tiered vs {int(single_tokens)} single tier "
+          f"({int(tiered_tokens - single_tokens):+d})")
+
+
+if __name__ == "__main__":
+    main()
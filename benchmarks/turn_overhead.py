@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+"""
+Measure framework overhead per turn: a zero-latency stub model and stub search tools,
+so everything timed is graph, node, prompt, store and client work paid on every turn.
+
+    python benchmarks/turn_overhead.py --turns 200
+    python benchmarks/turn_overhead.py --turns 200 --out runs/overhead.json
+
+Also times the per-call work the graph now does once: binding tool schemas to the
+model and constructing the search clients.
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import random
+import statistics
+import sys
+import time
+from collections import defaultdict
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from langchain_community.utilities import ArxivAPIWrapper, WikipediaAPIWrapper
+from langchain_core.messages import HumanMessage
+
+from load_test import DEFAULT_MIX, TEMPLATES, VOCABULARY, percentile
+from src.graph.manager_graph import ManagerAIGraph
+from src.harness.stub_model import StubChatModel, stub_search_tools
+from src.nodes.action_nodes import DECIDE_ACTION_TOOLS
+from src.tools.search_tools import search_execution_tools
+
+
+def make_turns(rng, count):
+    intents, weights = zip(*DEFAULT_MIX.items())
+    turns = []
+    for _ in range(count):
+        intent = rng.choices(intents, weights)[0]
+        template = rng.choice(TEMPLATES[intent])
+        turns.append((intent, template.format(**{k: rng.choice(v) for k, v in VOCABULARY.items()})))
+    return turns
+
+
+def run_turns(ai_graph, turns, users):
+    """Time each turn and each node from the update stream; users are rotated round-robin."""
+    turn_times, node_times = defaultdict(list), defaultdict(list)
+    for i, (intent, message) in enumerate(turns):
+        user = f"overhead-user-{i % users}"
+        config = {"configurable": {"thread_id": f"{user}-thread", "user_id": user}}
+        started = last = time.perf_counter()
+        for update in ai_graph.stream({"messages": [HumanMessage(content=message)]}, config, stream_mode="updates"):
+            now = time.perf_counter()
+            for node in update:
+                node_times[node].append(now - last)
+            last = now
+        turn_times[intent].append(time.perf_counter() - started)
+    return turn_times, node_times
+
+
+def time_per_call(fn, repeat):
+    started = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - started) / repeat
+
+
+def summarize(times):
+    return {"calls": len(times), "mean_ms": statistics.fmean(times) * 1000,
+            "p50_ms": percentile(times, 50) * 1000, "p95_ms": percentile(times, 95) * 1000}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--turns", type=int, default=200)
+    parser.add_argument("--users", type=int, default=10, help="Turns are spread over this many users")
+    parser.add_argument("--warmup", type=int, default=20)
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--out", help="Write results as JSON")
+    args = parser.parse_args()
+
+    model = StubChatModel(latency_median=0, latency_sigma=0, seed=args.seed)
+    tools = stub_search_tools(search_execution_tools, 0, 0, seed=args.seed)
+    ai_graph = ManagerAIGraph(snapshot_path=None, cassette=None, model=model, search_tools=tools)
+
+    rng = random.Random(args.seed)
+    # Nodes print whole prompts; that is part of the overhead, but not of the report
+    with contextlib.redirect_stdout(io.StringIO()):
+        run_turns(ai_graph, make_turns(rng, args.warmup), args.users)
+        turn_times, node_times = run_turns(ai_graph, make_turns(rng, args.turns), args.users)
+
+    all_turns = [t for times in turn_times.values() for t in times]
+    report = {
+        "turn": summarize(all_turns),
+        "intents": {intent: summarize(times) for intent, times in turn_times.items()},
+        "nodes": {node: summarize(times) for node, times in node_times.items()},
+        # Work the nodes used to repeat per call, timed on its own
+        "per_call_costs_ms": {
+            "bind_tools (decide_initial_action)": time_per_call(lambda: model.bind_tools(DECIDE_ACTION_TOOLS), 200) * 1000,
+            "WikipediaAPIWrapper()": time_per_call(lambda: WikipediaAPIWrapper(top_k_results=2), 50) * 1000,
+            "ArxivAPIWrapper()": time_per_call(lambda: ArxivAPIWrapper(load_max_docs=3), 50) * 1000,
+        },
+    }
+
+    t = report["turn"]
+    print(f"Framework overhead per turn ({t['calls']} turns, zero-latency stubs): "
+          f"mean {t['mean_ms']:.2f} ms  p50 {t['p50_ms']:.2f} ms  p95 {t['p95_ms']:.2f} ms")
+    print(f"\n  {'intent':<14} {'turns':>6} {'mean ms':>9} {'p95 ms':>8}")
+    for intent, s in sorted(report["intents"].items()):
+        print(f"  {intent:<14} {s['calls']:>6} {s['mean_ms']:>9.2f} {s['p95_ms']:>8.2f}")
+    print(f"\n  {'node':<26} {'calls':>6} {'mean ms':>9} {'p95 ms':>8}")
+    for node, s in sorted(report["nodes"].items(), key=lambda item: -item[1]["mean_ms"] * item[1]["calls"]):
+        print(f"  {node:<26} {s['calls']:>6} {s['mean_ms']:>9.2f} {s['p95_ms']:>8.2f}")
+    print("\nPer-call cost of work now done once at build time:")
+    for name, ms in report["per_call_costs_ms"].items():
+        print(f"  {name:<36} {ms:>8.3f} ms")
+
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
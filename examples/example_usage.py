@@ -24,15 +24,18 @@ def demo_profile_management():
         "Actually, I should update that - I'm now working remotely from Seattle.",
     ]
 
-    for interaction in interactions:
-        print(f"\nUser: {interaction}")
-        input_messages = [HumanMessage(content=interaction)]
+    try:
+        for interaction in interactions:
+            print(f"\nUser: {interaction}")
+            input_messages = [HumanMessage(content=interaction)]
 
-        for chunk in ai_graph.stream({"messages": input_messages}, config, stream_mode="values"):
-            latest_message = chunk["messages"][-1]
-            if hasattr(latest_message, 'content') and latest_message.content:
-                print(f"AI: {latest_message.content}")
-                break
+            for chunk in ai_graph.stream({"messages": input_messages}, config, stream_mode="values"):
+                latest_message = chunk["messages"][-1]
+                if hasattr(latest_message, 'content') and latest_message.content:
+                    print(f"AI: {latest_message.content}")
+                    break
+    finally:
+        ai_graph.close()
 
 
 def demo_task_management():
@@ -51,15 +54,18 @@ def demo_task_management():
         "Show me my current ticket list.",
     ]
 
-    for interaction in interactions:
-        print(f"\nUser: {interaction}")
-        input_messages = [HumanMessage(content=interaction)]
+    try:
+        for interaction in interactions:
+            print(f"\nUser: {interaction}")
+            input_messages = [HumanMessage(content=interaction)]
 
-        for chunk in ai_graph.stream({"messages": input_messages}, config, stream_mode="values"):
-            latest_message = chunk["messages"][-1]
-            if hasattr(latest_message, 'content') and latest_message.content:
-                print(f"AI: {latest_message.content}")
-                break
+            for chunk in ai_graph.stream({"messages": input_messages}, config, stream_mode="values"):
+                latest_message = chunk["messages"][-1]
+                if hasattr(latest_message, 'content') and latest_message.content:
+                    print(f"AI: {latest_message.content}")
+                    break
+    finally:
+        ai_graph.close()
 
 
 def demo_research_capabilities():
@@ -77,15 +83,18 @@ def demo_research_capabilities():
         "Search for the latest trends in product management methodologies.",
     ]
 
-    for interaction in interactions:
-        print(f"\nUser: {interaction}")
-        input_messages = [HumanMessage(content=interaction)]
-
-        for chunk in ai_graph.stream({"messages": input_messages}, config, stream_mode="values"):
-            latest_message = chunk["messages"][-1]
-            if hasattr(latest_message, 'content') and latest_message.content:
-                print(f"AI: {latest_message.content}")
-                break
+    try:
+        for interaction in interactions:
+            print(f"\nUser: {interaction}")
+            input_messages = [HumanMessage(content=interaction)]
+
+            for chunk in ai_graph.stream({"messages": input_messages}, config, stream_mode="values"):
+                latest_message = chunk["messages"][-1]
+                if hasattr(latest_message, 'content') and latest_message.content:
+                    print(f"AI: {latest_message.content}")
+                    break
+    finally:
+        ai_graph.close()
 
 
 def run_all_demos():
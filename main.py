@@ -29,40 +29,44 @@ def main():
     # Configuration for the session
     config = {"configurable": {"thread_id": "main-session", "user_id": "user1"}}
 
-    while True:
-        try:
-            user_input = input("You: ").strip()
+    try:
+        while True:
+            try:
+                user_input = input("You: ").strip()
 
-            if user_input.lower() in ['quit', 'exit', 'bye']:
-                print("Thank you for using Manager AI. Goodbye!")
-                break
+                if user_input.lower() in ['quit', 'exit', 'bye']:
+                    print("Thank you for using Manager AI. Goodbye!")
+                    break
 
-            if user_input.lower() == 'help':
-                show_help()
-                continue
+                if user_input.lower() == 'help':
+                    show_help()
+                    continue
 
-            if not user_input:
-                continue
+                if not user_input:
+                    continue
 
-            # Process the user input
-            input_messages = [HumanMessage(content=user_input)]
+                # Process the user input
+                input_messages = [HumanMessage(content=user_input)]
 
-            print("\nManager AI: ", end="")
-            for chunk in ai_graph.stream({"messages": input_messages}, config, stream_mode="values"):
-                latest_message = chunk["messages"][-1]
-                # Only print AI messages to avoid showing tool calls
-                if hasattr(latest_message, 'content') and latest_message.content and not hasattr(latest_message, 'tool_calls'):
-                    print(latest_message.content)
-                    break
+                print("\nManager AI: ", end="")
+                for chunk in ai_graph.stream({"messages": input_messages}, config, stream_mode="values"):
+                    latest_message = chunk["messages"][-1]
+                    # Only print AI messages to avoid showing tool calls
+                    if hasattr(latest_message, 'content') and latest_message.content and not hasattr(latest_message, 'tool_calls'):
+                        print(latest_message.content)
+                        break
 
-            print("\n" + "-"*50 + "\n")
+                print("\n" + "-"*50 + "\n")
 
-        except KeyboardInterrupt:
-            print("\n\nSession interrupted. Goodbye!")
-            break
-        except Exception as e:
-            print(f"\nError: {e}")
-            print("Please try again.\n")
+            except KeyboardInterrupt:
+                print("\n\nSession interrupted. Goodbye!")
+                break
+            except Exception as e:
+                print(f"\nError: {e}")
+                print("Please try again.\n")
+    finally:
+        # Writes a final memory snapshot when MANAGER_AI_SNAPSHOT_PATH is set
+        ai_graph.close()
 
 
 def show_help():
@@ -115,18 +119,21 @@ def run_example():
         "Can you find recent articles on AI in project management?"
     ]
 
-    for example in examples:
-        print(f"\nUser: {example}")
-        print("Manager AI: ", end="")
+    try:
+        for example in examples:
+            print(f"\nUser: {example}")
+            print("Manager AI: ", end="")
 
-        input_messages = [HumanMessage(content=example)]
-        for chunk in ai_graph.stream({"messages": input_messages}, config, stream_mode="values"):
-            latest_message = chunk["messages"][-1]
-            if hasattr(latest_message, 'content') and latest_message.content and not hasattr(latest_message, 'tool_calls'):
-                print(latest_message.content)
-                break
+            input_messages = [HumanMessage(content=example)]
+            for chunk in ai_graph.stream({"messages": input_messages}, config, stream_mode="values"):
+                latest_message = chunk["messages"][-1]
+                if hasattr(latest_message, 'content') and latest_message.content and not hasattr(latest_message, 'tool_calls'):
+                    print(latest_message.content)
+                    break
 
-        print("\n" + "-"*30)
+            print("\n" + "-"*30)
+    finally:
+        ai_graph.close()
 
 
 if __name__ == "__main__":
@@ -30,3 +30,113 @@ def setup_environment():
 # Model configuration
 MODEL_NAME = "qwen-qwq-32b"
 MODEL_TEMPERATURE = 0
+
+# Model tiers: a small low-latency model for extraction and memory rewrites,
+# the reasoning model where it helps
+FAST_MODEL_NAME = os.environ.get("MANAGER_AI_FAST_MODEL", "llama-3.1-8b-instant")
+
+# Reasoning output policy for the reasoning tier. "parsed" keeps the trace out of the
+# message content, "hidden" suppresses it, "raw" inlines it in <think> tags (stripped
+# before anything is stored or shown). Effort and max_tokens bound the reasoning budget.
+REASONING_FORMAT = os.environ.get("MANAGER_AI_REASONING_FORMAT", "parsed")
+REASONING_EFFORT = os.environ.get("MANAGER_AI_REASONING_EFFORT")
+REASONING_MAX_TOKENS = int(os.environ["MANAGER_AI_REASONING_MAX_TOKENS"]) if os.environ.get("MANAGER_AI_REASONING_MAX_TOKENS") else None
+# Keep parsed traces in additional_kwargs (they are otherwise dropped after counting)
+KEEP_REASONING_CONTENT = False
+
+MODEL_TIERS = {
+    "fast": {"model": FAST_MODEL_NAME, "temperature": 0},
+    "reasoning": {
+        "model": MODEL_NAME,
+        "temperature": MODEL_TEMPERATURE,
+        "reasoning_format": REASONING_FORMAT,
+        "reasoning_effort": REASONING_EFFORT,
+        "max_tokens": REASONING_MAX_TOKENS,
+    },
+}
+
+# Tier per graph node; nodes not listed use ESCALATION_TIER
+NODE_MODEL_TIERS = {
+    "decide_initial_action": "reasoning",
+    "handle_search_result": "reasoning",
+    "profile_extractor": "fast",
+    "ticket_extractor": "fast",
+    "update_instructions": "fast",
+    "update_userfeedback": "fast",
+    "update_productresearch": "fast",
+}
+
+# Calls that fail or come back empty on a smaller tier are retried on this tier
+ESCALATION_TIER = "reasoning"
+
+# Memory snapshot configuration (warm restarts of the cross-thread store)
+SNAPSHOT_PATH = os.environ.get("MANAGER_AI_SNAPSHOT_PATH")
+SNAPSHOT_INTERVAL_SECONDS = float(os.environ.get("MANAGER_AI_SNAPSHOT_INTERVAL", "300"))
+
+# Record/replay of LLM and search interactions ("record", "replay" or unset)
+CASSETTE_PATH = os.environ.get("MANAGER_AI_CASSETTE_PATH")
+CASSETTE_MODE = os.environ.get("MANAGER_AI_CASSETTE_MODE")
+CASSETTE_LATENCY_SCALE = float(os.environ.get("MANAGER_AI_CASSETTE_LATENCY_SCALE", "0"))
+
+# Compare-and-set memory writes: how often a losing read-modify-write is re-run
+MEMORY_WRITE_MAX_RETRIES = 3
+
+# Offline full-text corpus (SQLite FTS5) consulted by wiki_search / arxiv_search before the network
+LOCAL_CORPUS_PATH = os.environ.get("MANAGER_AI_CORPUS_PATH")
+# Share of a query's terms a local document must contain to count as a hit; below it the tools go to the network
+LOCAL_CORPUS_MIN_COVERAGE = float(os.environ.get("MANAGER_AI_CORPUS_MIN_COVERAGE", "0.5"))
+
+# Near-duplicate ticket detection (MinHash/LSH over task text). A candidate with at least
+# TICKET_DEDUP_MIN_TOKENS content words is merged into an existing ticket when the estimated
+# Jaccard similarity reaches the threshold and it keeps all of that ticket's content words,
+# except ones common in the user's backlog (in TICKET_DEDUP_COMMON_SHARE of the tickets and
+# at least TICKET_DEDUP_COMMON_MIN of them). Swapping a rarer word ("... on iOS" /
+# "... on Android") keeps the tickets separate.
+TICKET_DEDUP_ENABLED = os.environ.get("MANAGER_AI_TICKET_DEDUP", "1") != "0"
+TICKET_DEDUP_THRESHOLD = 0.5
+TICKET_DEDUP_MIN_TOKENS = 3
+TICKET_DEDUP_COMMON_SHARE = 0.05
+TICKET_DEDUP_COMMON_MIN = 10
+TICKET_DEDUP_NUM_PERM = 64
+TICKET_DEDUP_BANDS = 16
+
+# Ticket listing requests ("show me my tickets", "what's overdue this week") are answered
+# from the columnar ticket table without an LLM call; prompts get a capped ticket summary
+TICKET_FAST_PATH_ENABLED = os.environ.get("MANAGER_AI_TICKET_FAST_PATH", "1") != "0"
+TICKET_LIST_LIMIT = 50
+TICKET_PROMPT_LIMIT = 20
+
+# Tiered hot/cold memory: when a spill directory is set, users idle longest are written
+# there (store namespaces and checkpoint threads) once resident memory exceeds the cap,
+# and reloaded on their next turn
+MEMORY_SPILL_DIR = os.environ.get("MANAGER_AI_SPILL_DIR")
+MEMORY_CAP_BYTES = int(float(os.environ.get("MANAGER_AI_MEMORY_CAP_MB", "512")) * 2**20)
+MEMORY_IDLE_SECONDS = float(os.environ["MANAGER_AI_MEMORY_IDLE_SECONDS"]) if os.environ.get("MANAGER_AI_MEMORY_IDLE_SECONDS") else None
+
+# LLM call scheduling: at most LLM_MAX_CONCURRENCY provider calls run at once per process
+# (0 disables the scheduler). The budget is not shared between processes, so a WorkerPool of
+# N workers makes up to N * LLM_MAX_CONCURRENCY calls at once; size it per worker. Waiting
+# calls run interactive first, then background, then bulk, earliest deadline first within a
+# class; a call moves up a class for every PRIORITY_AGING_SECONDS it waits. Every node runs
+# on the turn's critical path (extraction and memory rewrites finish before the reply is
+# returned), so all are interactive; background and bulk are for work off that path, marked
+# with llm_priority().
+LLM_MAX_CONCURRENCY = int(os.environ.get("MANAGER_AI_LLM_CONCURRENCY", "8"))
+NODE_PRIORITIES = {
+    "decide_initial_action": "interactive",
+    "handle_search_result": "interactive",
+    "profile_extractor": "interactive",
+    "ticket_extractor": "interactive",
+    "update_instructions": "interactive",
+    "update_userfeedback": "interactive",
+    "update_productresearch": "interactive",
+}
+PRIORITY_DEADLINE_SECONDS = {"interactive": 2.0, "background": 30.0, "bulk": 300.0}
+PRIORITY_AGING_SECONDS = 10.0
+
+# Speculative search prefetch: predict a search from the user's message and run it while
+# decide_initial_action waits on the model; used when the model's tool call matches
+SEARCH_PREFETCH_ENABLED = os.environ.get("MANAGER_AI_SEARCH_PREFETCH", "0") == "1"
+# Minimum term overlap (Jaccard) between the predicted and the model's query
+PREFETCH_MATCH_THRESHOLD = 0.5
+PREFETCH_WORKERS = 4
@@ -1,19 +1,41 @@
-from langchain_groq import ChatGroq
+import time
+from contextlib import contextmanager
+
 from trustcall import create_extractor
+from langchain_core.messages import HumanMessage
 from langgraph.prebuilt import ToolNode
-from langgraph.checkpoint.memory import MemorySaver
 from langgraph.graph import StateGraph, MessagesState, END, START
-from langgraph.store.memory import InMemoryStore
 
-from ..config.settings import MODEL_NAME, MODEL_TEMPERATURE
+from ..config.settings import (
+    SNAPSHOT_PATH,
+    SNAPSHOT_INTERVAL_SECONDS,
+    CASSETTE_PATH,
+    CASSETTE_MODE,
+    CASSETTE_LATENCY_SCALE,
+    TICKET_FAST_PATH_ENABLED,
+    MEMORY_SPILL_DIR,
+    MEMORY_CAP_BYTES,
+    MEMORY_IDLE_SECONDS,
+    NODE_PRIORITIES,
+    SEARCH_PREFETCH_ENABLED
+)
+from ..memory.snapshot import LazySnapshotStore, PeriodicSnapshotter
+from ..memory.tiered import IndexedMemorySaver, TieredMemory
+from ..harness.cassette import REPLAY, open_cassette, wrap_model, wrap_tools
 from ..models.schemas import Profile, TicketDetails, UpdateMemory
+from ..models.model_factory import build_node_model, build_tier_model
+from ..models.scheduler import INTERACTIVE, ScheduledChatModel, get_scheduler
+from ..tools.prefetch import SearchPrefetcher, prefetch_key, prefetching_tools
 from ..tools.search_tools import search_execution_tools
 from ..nodes.action_nodes import (
+    DECIDE_ACTION_TOOLS,
+    SEARCH_RESULT_TOOLS,
     decide_initial_action, 
     handle_search_result,
     route_from_initial_action,
     route_from_search_handling
 )
+from ..nodes.query_nodes import answer_ticket_query, route_from_start
 from ..nodes.update_nodes import (
     update_userprofile,
     update_tickets,
@@ -24,38 +46,130 @@ from ..nodes.update_nodes import (
 
 
 class ManagerAIGraph:
-    def __init__(self):
-        self.model = ChatGroq(model=MODEL_NAME, temperature=MODEL_TEMPERATURE)
-        self.across_thread_memory = InMemoryStore()
-        self.within_thread_memory = MemorySaver()
+    def __init__(self, snapshot_path=SNAPSHOT_PATH, snapshot_interval=SNAPSHOT_INTERVAL_SECONDS, cassette=None, model=None,
+                 search_tools=None, node_tiers=None, spill_dir=MEMORY_SPILL_DIR, memory_cap_bytes=MEMORY_CAP_BYTES,
+                 memory_idle_seconds=MEMORY_IDLE_SECONDS, scheduler=None, search_prefetch=SEARCH_PREFETCH_ENABLED):
+        # `model` and `search_tools` override ChatGroq and the live search tools (e.g. stubs for load tests)
+        self.base_model = model
+        # Per-node model tier assignment; defaults to NODE_MODEL_TIERS in settings
+        self.node_tiers = node_tiers
+        # Optional record/replay cassette for offline, deterministic runs
+        if cassette is None:
+            cassette = open_cassette(CASSETTE_PATH, CASSETTE_MODE, latency_scale=CASSETTE_LATENCY_SCALE)
+        self.cassette = cassette
+        # Shared priority scheduler for LLM calls; interactive nodes go ahead of extraction
+        self.scheduler = scheduler if scheduler is not None else get_scheduler()
+        self.models = {
+            node: self._schedule(node, build_node_model(node, self.node_tiers, make_model=self._build_model))
+            for node in (
+                "decide_initial_action",
+                "handle_search_result",
+                "profile_extractor",
+                "ticket_extractor",
+                "update_instructions",
+                "update_userfeedback",
+                "update_productresearch",
+            )
+        }
+        # Bound once here rather than per call inside the nodes
+        self.bound_models = {
+            "decide_initial_action": self.models["decide_initial_action"].bind_tools(DECIDE_ACTION_TOOLS),
+            "handle_search_result": self.models["handle_search_result"].bind_tools(SEARCH_RESULT_TOOLS),
+        }
+        # Restores lazily from the last snapshot (if any), one namespace at a time
+        self.across_thread_memory = LazySnapshotStore(snapshot_path)
+        self.within_thread_memory = IndexedMemorySaver()
+
+        # Spills idle users' memory and threads to disk under a resident memory cap
+        self.tiered_memory = None
+        if spill_dir:
+            self.tiered_memory = TieredMemory(
+                self.across_thread_memory, self.within_thread_memory, spill_dir,
+                max_bytes=memory_cap_bytes, idle_seconds=memory_idle_seconds,
+                # Spill files stay the durable copy of reloaded users until a snapshot has them
+                keep_until_snapshot=bool(snapshot_path),
+            )
+
+        self.snapshot_path = snapshot_path
+        self.snapshotter = None
+        if snapshot_path and snapshot_interval:
+            self.snapshotter = PeriodicSnapshotter(
+                self.across_thread_memory, snapshot_path, snapshot_interval, on_written=self._snapshot_written
+            ).start()
 
         # Create extractors
         self.profile_extractor = create_extractor(
-            self.model,
+            self.models["profile_extractor"],
             tools=[Profile],
             tool_choice="Profile",
         )
 
         self.ticket_extractor = create_extractor(
-            self.model,
+            self.models["ticket_extractor"],
             tools=[TicketDetails],
             tool_choice="TicketDetails",
             enable_inserts=True
         )
 
-        self.search_tool_node = ToolNode(search_execution_tools)
+        self.search_tools = wrap_tools(search_tools or search_execution_tools, self.cassette)
+        # Speculative search alongside decide_initial_action; off with a cassette, since
+        # speculative calls would be recorded (or replayed) out of turn order
+        self.prefetcher = None
+        if search_prefetch and self.cassette is None:
+            self.prefetcher = SearchPrefetcher(self.search_tools)
+            self.search_tool_node = ToolNode(prefetching_tools(self.search_tools, self.prefetcher))
+        else:
+            self.search_tool_node = ToolNode(self.search_tools)
         self.graph = self._build_graph()
 
+    def _schedule(self, node, model):
+        if self.scheduler is None:
+            return model
+        return ScheduledChatModel(inner=model, scheduler=self.scheduler, priority=NODE_PRIORITIES.get(node, INTERACTIVE))
+
+    def _build_model(self, tier, label):
+        """Create the chat model for a tier, wrapped for recording or replay when a cassette is set."""
+        replaying = self.cassette is not None and self.cassette.mode == REPLAY
+        if replaying:
+            model = None
+        elif self.base_model is not None:
+            model = self.base_model
+        else:
+            model = build_tier_model(tier)
+        return wrap_model(model, self.cassette, label)
+
     def _build_graph(self):
         """Build the state graph with all nodes and edges."""
         builder = StateGraph(MessagesState)
 
         # Create node wrapper functions
+        search_tool_names = {tool.name for tool in self.search_tools}
+
         def decide_initial_action_node(state, config):
-            return decide_initial_action(state, config, self.across_thread_memory, self.model)
+            last_message = state["messages"][-1]
+            # First decision of a turn: start the predicted search while the model thinks
+            speculating = (
+                self.prefetcher is not None
+                and isinstance(last_message, HumanMessage)
+                and isinstance(last_message.content, str)
+                and self.prefetcher.start(prefetch_key(config), last_message.content)
+            )
+            result = decide_initial_action(state, config, self.across_thread_memory, self.bound_models["decide_initial_action"])
+            if speculating and not any(tc["name"] in search_tool_names for tc in result["messages"][-1].tool_calls):
+                self.prefetcher.discard(prefetch_key(config))
+            return result
 
         def handle_search_result_node(state, config):
-            return handle_search_result(state, config, self.across_thread_memory, self.model)
+            if self.prefetcher is not None:
+                # Searches are done; a prefetch nobody claimed predicted the wrong tool
+                self.prefetcher.discard(prefetch_key(config), outcome="missed")
+            return handle_search_result(state, config, self.across_thread_memory, self.bound_models["handle_search_result"])
+
+        def answer_ticket_query_node(state, config):
+            return answer_ticket_query(state, config, self.across_thread_memory)
+
+        def route_from_start_edge(state, config):
+            return route_from_start(state, config, self.across_thread_memory)
 
         def update_userprofile_node(state, config):
             return update_userprofile(state, config, self.across_thread_memory, self.profile_extractor)
@@ -64,13 +178,13 @@ class ManagerAIGraph:
             return update_tickets(state, config, self.across_thread_memory, self.ticket_extractor)
 
         def update_instructions_node(state, config):
-            return update_instructions(state, config, self.across_thread_memory, self.model)
+            return update_instructions(state, config, self.across_thread_memory, self.models["update_instructions"])
 
         def update_userfeedback_node(state, config):
-            return update_userfeedback(state, config, self.across_thread_memory, self.model)
+            return update_userfeedback(state, config, self.across_thread_memory, self.models["update_userfeedback"])
 
         def update_productresearch_node(state, config):
-            return update_productresearch(state, config, self.across_thread_memory, self.model)
+            return update_productresearch(state, config, self.across_thread_memory, self.models["update_productresearch"])
 
         # Add nodes
         builder.add_node("decide_initial_action", decide_initial_action_node)
@@ -83,7 +197,19 @@ class ManagerAIGraph:
         builder.add_node("execute_search_tools", self.search_tool_node)
 
         # Define edges
-        builder.add_edge(START, "decide_initial_action")
+        if TICKET_FAST_PATH_ENABLED:
+            builder.add_node("answer_ticket_query", answer_ticket_query_node)
+            builder.add_conditional_edges(
+                START,
+                route_from_start_edge,
+                {
+                    "answer_ticket_query": "answer_ticket_query",
+                    "decide_initial_action": "decide_initial_action"
+                }
+            )
+            builder.add_edge("answer_ticket_query", END)
+        else:
+            builder.add_edge(START, "decide_initial_action")
 
         builder.add_conditional_edges(
             "decide_initial_action",
@@ -122,10 +248,45 @@ class ManagerAIGraph:
 
         return builder.compile(checkpointer=self.within_thread_memory, store=self.across_thread_memory)
 
+    @contextmanager
+    def _resident(self, config):
+        """Keep the turn's user in memory (reloading them if spilled) for the duration of a turn."""
+        if self.tiered_memory is None:
+            yield
+            return
+        configurable = config["configurable"]
+        with self.tiered_memory.user(configurable["user_id"], configurable.get("thread_id")):
+            yield
+
     def stream(self, input_data, config, stream_mode="values"):
         """Stream the graph execution."""
-        return self.graph.stream(input_data, config, stream_mode=stream_mode)
+        with self._resident(config):
+            yield from self.graph.stream(input_data, config, stream_mode=stream_mode)
 
     def invoke(self, input_data, config):
         """Invoke the graph once."""
-        return self.graph.invoke(input_data, config)
+        with self._resident(config):
+            return self.graph.invoke(input_data, config)
+
+    def snapshot(self, path=None):
+        """Write the cross-thread memory store to a snapshot file."""
+        path = path or self.snapshot_path
+        if not path:
+            raise ValueError("No snapshot path configured")
+        started = time.monotonic()
+        count = self.across_thread_memory.snapshot(path)
+        if path == self.snapshot_path:
+            self._snapshot_written(started)
+        return count
+
+    def _snapshot_written(self, started):
+        if self.tiered_memory is not None:
+            self.tiered_memory.snapshot_written(started)
+
+    def close(self):
+        """Stop background snapshots (writing a final one if configured) and search prefetching."""
+        if self.snapshotter:
+            self.snapshotter.stop(final_snapshot=True)
+            self.snapshotter = None
+        if self.prefetcher:
+            self.prefetcher.close()
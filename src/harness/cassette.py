@@ -0,0 +1,236 @@
+import difflib
+import hashlib
+import json
+import re
+import threading
+import time
+from collections import defaultdict
+from typing import Any, Dict, List, Optional
+
+from langchain_core.callbacks import CallbackManagerForLLMRun
+from langchain_core.messages import BaseMessage, message_to_dict, messages_from_dict
+from langchain_core.outputs import ChatGeneration, ChatResult
+from langchain_core.tools import StructuredTool
+from langchain_core.utils.function_calling import convert_to_openai_tool
+
+from .delegating import DelegatingChatModel
+
+
+RECORD = "record"
+REPLAY = "replay"
+
+# Values that change on every run and must not count as prompt drift
+_VOLATILE_PATTERNS = [
+    (re.compile(r"\d{4}-\d{2}-\d{2}[T ]\d{2}:\d{2}:\d{2}(\.\d+)?([+-]\d{2}:\d{2}|Z)?"), "<datetime>"),
+    (re.compile(r"[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}"), "<uuid>"),
+    (re.compile(r"\bcall_[A-Za-z0-9]+\b"), "<call_id>"),
+]
+
+
+class PromptDriftError(Exception):
+    """Raised in strict replay when a request no longer matches the cassette."""
+
+
+def normalize_request(request: Dict[str, Any]) -> str:
+    """Stable text form of a request, with run-specific values masked."""
+    text = json.dumps(request, sort_keys=True, default=str, indent=1)
+    for pattern, placeholder in _VOLATILE_PATTERNS:
+        text = pattern.sub(placeholder, text)
+    return text
+
+
+def request_key(request: Dict[str, Any]) -> str:
+    return hashlib.sha256(normalize_request(request).encode("utf-8")).hexdigest()[:16]
+
+
+def _chat_request(messages: List[BaseMessage], kwargs: Dict[str, Any]) -> Dict[str, Any]:
+    tools = [t.get("function", {}).get("name", t.get("name")) for t in kwargs.get("tools", []) if isinstance(t, dict)]
+    return {
+        "messages": [
+            {"type": m.type, "content": m.content, "tool_calls": getattr(m, "tool_calls", None) or []}
+            for m in messages
+        ],
+        "tools": tools,
+        "tool_choice": kwargs.get("tool_choice"),
+    }
+
+
+def _usage(result: ChatResult) -> Dict[str, int]:
+    usage = {"input_tokens": 0, "output_tokens": 0, "total_tokens": 0}
+    for generation in result.generations:
+        metadata = getattr(generation.message, "usage_metadata", None) or {}
+        for field in usage:
+            usage[field] += metadata.get(field, 0) or 0
+    return usage
+
+
+class Cassette:
+    """Recorded chat-model and tool interactions, stored as JSON lines.
+
+    In record mode every interaction is appended together with its wall-clock time and
+    token usage. In replay mode interactions are served back in recorded order per label;
+    a request whose normalized form differs from the recording is flagged as prompt drift.
+    """
+
+    def __init__(self, path: str, mode: str = REPLAY, latency_scale: float = 0.0, strict: bool = False,
+                 loop: bool = False):
+        if mode not in (RECORD, REPLAY):
+            raise ValueError(f"Unknown cassette mode '{mode}'")
+        self.path = path
+        self.mode = mode
+        self.latency_scale = latency_scale
+        self.strict = strict
+        # Start over from the first recording once a label is exhausted (load tests)
+        self.loop = loop
+        self.entries: List[Dict[str, Any]] = []
+        self.drift: List[Dict[str, Any]] = []
+        self._lock = threading.Lock()
+        self._queues: Dict[str, List[Dict[str, Any]]] = defaultdict(list)
+
+        if mode == REPLAY:
+            with open(path, "r", encoding="utf-8") as f:
+                self.entries = [json.loads(line) for line in f if line.strip()]
+            for entry in self.entries:
+                self._queues[entry["label"]].append(entry)
+
+    def record(self, kind: str, label: str, request: Dict[str, Any], response: Any, elapsed: float,
+               usage: Optional[Dict[str, int]] = None):
+        entry = {
+            "kind": kind,
+            "label": label,
+            "key": request_key(request),
+            "request": request,
+            "response": response,
+            "elapsed": elapsed,
+            "usage": usage or {},
+        }
+        with self._lock:
+            self.entries.append(entry)
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(json.dumps(entry, default=str) + "\n")
+
+    def play(self, label: str, request: Dict[str, Any]) -> Dict[str, Any]:
+        """Pop the recorded entry for `request`, preferring an exact match over recorded order."""
+        key = request_key(request)
+        with self._lock:
+            queue = self._queues[label]
+            if not queue and self.loop:
+                queue.extend(entry for entry in self.entries if entry["label"] == label)
+            if not queue:
+                raise PromptDriftError(f"Cassette {self.path} has no more '{label}' interactions")
+            index = next((i for i, entry in enumerate(queue) if entry["key"] == key), None)
+            if index is None:
+                entry = queue.pop(0)
+                drift = {
+                    "label": label,
+                    "recorded_key": entry["key"],
+                    "request_key": key,
+                    "diff": "\n".join(difflib.unified_diff(
+                        normalize_request(entry["request"]).splitlines(),
+                        normalize_request(request).splitlines(),
+                        "recorded", "current", lineterm="", n=1,
+                    ))[:4000],
+                }
+                self.drift.append(drift)
+                if self.strict:
+                    raise PromptDriftError(f"Prompt drift for '{label}':\n{drift['diff']}")
+            else:
+                entry = queue.pop(index)
+
+        if self.latency_scale > 0:
+            time.sleep(entry["elapsed"] * self.latency_scale)
+        return entry
+
+    def summary(self) -> Dict[str, Dict[str, float]]:
+        """Calls, recorded seconds and tokens per label."""
+        totals: Dict[str, Dict[str, float]] = defaultdict(lambda: defaultdict(float))
+        for entry in self.entries:
+            label_totals = totals[entry["label"]]
+            label_totals["calls"] += 1
+            label_totals["elapsed"] += entry["elapsed"]
+            for field, value in entry.get("usage", {}).items():
+                label_totals[field] += value
+        return {label: dict(values) for label, values in totals.items()}
+
+
+class RecordingChatModel(DelegatingChatModel):
+    """Chat model that forwards to `inner` and records each call into a cassette."""
+    cassette: Any
+    label: str = "chat"
+
+    def _generate(self, messages, stop=None, run_manager: Optional[CallbackManagerForLLMRun] = None, **kwargs):
+        started = time.perf_counter()
+        result = self._call_model(self.inner, messages, stop, run_manager, **kwargs)
+        elapsed = time.perf_counter() - started
+        self.cassette.record(
+            "chat", self.label, _chat_request(messages, kwargs),
+            [message_to_dict(g.message) for g in result.generations],
+            elapsed, _usage(result),
+        )
+        return result
+
+
+class ReplayChatModel(DelegatingChatModel):
+    """Chat model that serves responses from a cassette without any network access."""
+    inner: Any = None
+    cassette: Any
+    label: str = "chat"
+
+    def bind_tools(self, tools, tool_choice=None, **kwargs):
+        formatted_tools = [convert_to_openai_tool(tool) for tool in tools]
+        if tool_choice is not None:
+            kwargs["tool_choice"] = tool_choice
+        return self.bind(tools=formatted_tools, **kwargs)
+
+    def _generate(self, messages, stop=None, run_manager: Optional[CallbackManagerForLLMRun] = None, **kwargs):
+        entry = self.cassette.play(self.label, _chat_request(messages, kwargs))
+        return ChatResult(generations=[
+            ChatGeneration(message=message) for message in messages_from_dict(entry["response"])
+        ])
+
+    @property
+    def _llm_type(self) -> str:
+        return "cassette-replay"
+
+
+def wrap_model(model, cassette: Optional[Cassette], label: str):
+    """Wrap a chat model for recording or replay; returns `model` unchanged without a cassette."""
+    if cassette is None:
+        return model
+    if cassette.mode == RECORD:
+        return RecordingChatModel(inner=model, cassette=cassette, label=label)
+    return ReplayChatModel(cassette=cassette, label=label)
+
+
+def wrap_tools(tools, cassette: Optional[Cassette]):
+    """Wrap search tools so their calls are recorded to, or replayed from, the cassette."""
+    if cassette is None:
+        return tools
+
+    def make_wrapper(tool):
+        label = f"tool:{tool.name}"
+
+        def run(**tool_input):
+            request = {"tool": tool.name, "args": tool_input}
+            if cassette.mode == REPLAY:
+                return cassette.play(label, request)["response"]
+            started = time.perf_counter()
+            output = tool.invoke(tool_input)
+            cassette.record("tool", label, request, output, time.perf_counter() - started)
+            return output
+
+        return StructuredTool.from_function(
+            func=run,
+            name=tool.name,
+            description=tool.description,
+            args_schema=tool.args_schema,
+        )
+
+    return [make_wrapper(tool) for tool in tools]
+
+
+def open_cassette(path: Optional[str], mode: Optional[str], **kwargs) -> Optional[Cassette]:
+    """Open the cassette configured in settings; recording appends to an existing file."""
+    if not path or not mode:
+        return None
+    return Cassette(path, mode=mode, **kwargs)
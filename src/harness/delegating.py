@@ -0,0 +1,57 @@
+from typing import Any, List, Optional
+
+from langchain_core.callbacks import CallbackManager, CallbackManagerForLLMRun
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import BaseMessage
+from langchain_core.outputs import ChatResult
+
+
+class DelegatingChatModel(BaseChatModel):
+    """Chat model that forwards every call to `inner`.
+
+    Tool binding is delegated as well, so the provider-specific tool and tool_choice
+    formatting of the inner model is kept. Subclasses hook into `_generate` and call
+    models through `_call_model`.
+    """
+    inner: BaseChatModel
+
+    def bind_tools(self, tools, **kwargs):
+        binding = self.inner.bind_tools(tools, **kwargs)
+        return self.bind(**binding.kwargs)
+
+    def _generate(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Optional[CallbackManagerForLLMRun] = None,
+        **kwargs: Any,
+    ) -> ChatResult:
+        return self._call_model(self.inner, messages, stop, run_manager, **kwargs)
+
+    @staticmethod
+    def _call_model(
+        model: BaseChatModel,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Optional[CallbackManagerForLLMRun] = None,
+        **kwargs: Any,
+    ) -> ChatResult:
+        """Call `model` through its public API, so its callbacks (tracing), rate limiter
+        and cache apply, with its run nested under this wrapper's run."""
+        callbacks = None
+        if run_manager is not None:
+            callbacks = CallbackManager(
+                handlers=run_manager.inheritable_handlers,
+                inheritable_handlers=run_manager.inheritable_handlers,
+                parent_run_id=run_manager.run_id,
+                tags=run_manager.inheritable_tags,
+                inheritable_tags=run_manager.inheritable_tags,
+                metadata=run_manager.inheritable_metadata,
+                inheritable_metadata=run_manager.inheritable_metadata,
+            )
+        result = model.generate([messages], stop=stop, callbacks=callbacks, **kwargs)
+        return ChatResult(generations=result.generations[0], llm_output=result.llm_output)
+
+    @property
+    def _llm_type(self) -> str:
+        return f"delegating-{self.inner._llm_type}"
@@ -1,6 +1,9 @@
 from typing import Dict, Any
 from langgraph.store.base import BaseStore
 
+from ..config.settings import TICKET_PROMPT_LIMIT
+from .ticket_table import compact_ticket_summary, ticket_table
+
 
 def load_memories(user_id: str, store: BaseStore) -> Dict[str, Any]:
     """Helper to load all memories for a user."""
@@ -16,15 +19,8 @@ def load_memories(user_id: str, store: BaseStore) -> Dict[str, Any]:
     if profile_mem:
         memories["user_profile"] = profile_mem[0].value
 
-    ticket_mems = store.search(("ticket", user_id))
-    # Tickets are stored as individual items, so we need to format them
-    formatted_tickets = []
-    for mem in ticket_mems:
-        if isinstance(mem.value, dict):
-            formatted_tickets.append(f"- Task: {mem.value.get('task', 'N/A')}, Status: {mem.value.get('status', 'N/A')}")
-        elif isinstance(mem.value, str):
-            formatted_tickets.append(mem.value)
-    memories["ticket"] = "\n".join(formatted_tickets) if formatted_tickets else "No tickets yet."
+    # Open tickets by deadline, capped, so the prompt stays small at any backlog size
+    memories["ticket"] = compact_ticket_summary(ticket_table(store, user_id), TICKET_PROMPT_LIMIT)
 
     instr_mem = store.get(("instructions", user_id), "instructions")
     if instr_mem: 
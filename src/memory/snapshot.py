@@ -0,0 +1,339 @@
+import mmap
+import os
+import struct
+import tempfile
+import threading
+import time
+from collections import defaultdict
+from datetime import datetime
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+import msgpack
+from langgraph.store.base import BaseStore, GetOp, Item, ListNamespacesOp, PutOp, SearchOp
+from langgraph.store.memory import InMemoryStore
+from pydantic import BaseModel
+
+
+# File layout: MAGIC | section* | index | footer
+# Each section is one namespace: a msgpack list of [key, value, created_at, updated_at].
+# The index maps namespace -> (offset, length, item count) and the footer holds the index offset.
+MAGIC = b"MAISNAP1"
+_FOOTER = struct.Struct("<Q")
+
+_EXT_DATETIME = 1
+
+_PAGE_SIZE = 1000
+
+
+def _default(obj: Any):
+    """Encode values msgpack cannot represent natively: datetimes, and Pydantic models as plain dicts.
+
+    Anything else is rejected rather than pickled, since restoring a pickle would run
+    code from the snapshot file.
+    """
+    if isinstance(obj, datetime):
+        return msgpack.ExtType(_EXT_DATETIME, obj.isoformat().encode("utf-8"))
+    if isinstance(obj, BaseModel):
+        return obj.model_dump(mode="json")
+    raise TypeError(f"Cannot snapshot value of type {type(obj).__name__}")
+
+
+def _ext_hook(code: int, data: bytes):
+    if code == _EXT_DATETIME:
+        return datetime.fromisoformat(data.decode("utf-8"))
+    return msgpack.ExtType(code, data)
+
+
+def pack(obj: Any) -> bytes:
+    return msgpack.packb(obj, default=_default, use_bin_type=True)
+
+
+def unpack(data) -> Any:
+    return msgpack.unpackb(data, ext_hook=_ext_hook, raw=False, strict_map_key=False)
+
+
+def _encode_items(items: Iterable[Item]) -> bytes:
+    return pack([[item.key, item.value, item.created_at, item.updated_at] for item in items])
+
+
+def _iter_store_namespaces(store: BaseStore) -> Dict[Tuple[str, ...], List[Item]]:
+    """Read every namespace of a store through the public BaseStore API."""
+    namespaces = []
+    offset = 0
+    while True:
+        page = store.list_namespaces(limit=_PAGE_SIZE, offset=offset)
+        namespaces.extend(page)
+        if len(page) < _PAGE_SIZE:
+            break
+        offset += _PAGE_SIZE
+
+    return {tuple(namespace): read_namespace(store, namespace) for namespace in namespaces}
+
+
+def read_namespace(store: BaseStore, namespace: Tuple[str, ...]) -> List[Item]:
+    """Every item stored directly in `namespace` (not its sub-namespaces), page by page."""
+    items = []
+    offset = 0
+    while True:
+        page = store.search(namespace, limit=_PAGE_SIZE, offset=offset)
+        items.extend(item for item in page if tuple(item.namespace) == tuple(namespace))
+        if len(page) < _PAGE_SIZE:
+            break
+        offset += _PAGE_SIZE
+    return items
+
+
+def _write_sections(path: str, encoded: Dict[Tuple[str, ...], Tuple[bytes, int]]) -> int:
+    """Atomically write encoded sections (namespace -> (bytes, item count)) to `path`."""
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(prefix=".snapshot-", dir=directory)
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(MAGIC)
+            index = []
+            for namespace, (data, count) in encoded.items():
+                index.append([list(namespace), f.tell(), len(data), count])
+                f.write(data)
+            index_offset = f.tell()
+            f.write(pack(index))
+            f.write(_FOOTER.pack(index_offset))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    return len(encoded)
+
+
+def write_snapshot(store: BaseStore, path: str) -> int:
+    """Write all namespaces of `store` to `path`. Returns the number of namespaces written."""
+    encoded = {namespace: (_encode_items(items), len(items))
+               for namespace, items in _iter_store_namespaces(store).items()}
+    return _write_sections(path, encoded)
+
+
+class SnapshotReader:
+    """Memory-mapped reader that decodes one namespace section at a time."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._file = open(path, "rb")
+        self._mmap = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        if self._mmap[:len(MAGIC)] != MAGIC:
+            self.close()
+            raise ValueError(f"{path} is not a memory snapshot")
+        (index_offset,) = _FOOTER.unpack(self._mmap[-_FOOTER.size:])
+        index = unpack(self._mmap[index_offset:len(self._mmap) - _FOOTER.size])
+        self.sections = {tuple(namespace): (offset, length, count) for namespace, offset, length, count in index}
+
+    @property
+    def namespaces(self) -> List[Tuple[str, ...]]:
+        return list(self.sections)
+
+    def raw_section(self, namespace: Tuple[str, ...]) -> Tuple[bytes, int]:
+        offset, length, count = self.sections[namespace]
+        return self._mmap[offset:offset + length], count
+
+    def read_section(self, namespace: Tuple[str, ...]) -> List[Item]:
+        data, _ = self.raw_section(namespace)
+        return [
+            Item(value=value, key=key, namespace=namespace, created_at=created_at, updated_at=updated_at)
+            for key, value, created_at, updated_at in unpack(data)
+        ]
+
+    def close(self):
+        self._mmap.close()
+        self._file.close()
+
+
+def _item_bytes(key: str, value: Any) -> int:
+    return len(key) + len(pack(value)) if value is not None else 0
+
+
+class LazySnapshotStore(InMemoryStore):
+    """InMemoryStore that restores a snapshot lazily, one namespace at a time.
+
+    Namespaces are decoded from the memory-mapped snapshot the first time an operation
+    touches them, so the graph can serve requests before every user has been loaded.
+    Each namespace's encoded size is kept up to date on every write.
+    """
+
+    def __init__(self, snapshot_path: Optional[str] = None, **kwargs):
+        super().__init__(**kwargs)
+        # Guards _data, _pending and _bytes; held by every batch so namespaces can be
+        # exported or imported while other users' operations run
+        self._lock = threading.RLock()
+        self._reader = None
+        self._pending = set()
+        self._bytes: Dict[Tuple[str, ...], int] = defaultdict(int)
+        if snapshot_path and os.path.exists(snapshot_path):
+            self._reader = SnapshotReader(snapshot_path)
+            self._pending = set(self._reader.namespaces)
+
+    def batch(self, ops):
+        ops = list(ops)
+        with self._lock:
+            self._ensure_loaded(ops)
+            # The last put per key wins, as in InMemoryStore
+            puts = {(tuple(op.namespace), op.key): op.value for op in ops if isinstance(op, PutOp)}
+            deltas = []
+            for (namespace, key), value in puts.items():
+                previous = self._data.get(namespace, {}).get(key)
+                deltas.append((namespace, _item_bytes(key, value) - (_item_bytes(key, previous.value) if previous else 0)))
+            results = super().batch(ops)
+            for namespace, delta in deltas:
+                self._bytes[namespace] += delta
+            return results
+
+    async def abatch(self, ops):
+        # Without an embedding index nothing here awaits, so run it under the lock like batch
+        return self.batch(ops)
+
+    def _namespaces_for(self, ops) -> set:
+        """Pending namespaces that the given operations can observe or overwrite."""
+        needed = set()
+        for op in ops:
+            if isinstance(op, (GetOp, PutOp)):
+                if tuple(op.namespace) in self._pending:
+                    needed.add(tuple(op.namespace))
+            elif isinstance(op, SearchOp):
+                prefix = tuple(op.namespace_prefix)
+                needed.update(ns for ns in self._pending if ns[:len(prefix)] == prefix)
+            elif isinstance(op, ListNamespacesOp):
+                needed.update(self._pending)
+        return needed
+
+    def _ensure_loaded(self, ops):
+        if not self._pending:
+            return
+        with self._lock:
+            for namespace in self._namespaces_for(ops):
+                self._load_namespace(namespace)
+
+    def _load_namespace(self, namespace: Tuple[str, ...]):
+        if namespace not in self._pending:
+            return
+        loaded = self._data[namespace]
+        for item in self._reader.read_section(namespace):
+            # Writes made after startup win over the snapshot copy
+            if item.key not in loaded:
+                loaded[item.key] = item
+                self._bytes[namespace] += _item_bytes(item.key, item.value)
+        self._pending.discard(namespace)
+        if not self._pending:
+            self._reader.close()
+            self._reader = None
+
+    def warm(self):
+        """Load every namespace still pending from the snapshot."""
+        with self._lock:
+            for namespace in list(self._pending):
+                self._load_namespace(namespace)
+
+    def snapshot(self, path: str) -> int:
+        """Write the store to `path`, copying still-unloaded sections without decoding them.
+
+        Only the item references and raw sections are taken under the lock; puts replace
+        items rather than mutating them, so encoding and writing happen without blocking
+        other operations.
+        """
+        with self._lock:
+            encoded = {namespace: self._reader.raw_section(namespace) for namespace in self._pending}
+            loaded = [(namespace, list(items.values())) for namespace, items in self._data.items() if items]
+        for namespace, items in loaded:
+            encoded[namespace] = (_encode_items(items), len(items))
+        return _write_sections(path, encoded)
+
+    def namespaces(self) -> List[Tuple[str, ...]]:
+        """Every non-empty namespace, including ones not yet loaded from the snapshot (without loading them)."""
+        with self._lock:
+            loaded = {namespace for namespace, items in self._data.items() if items}
+            return list(loaded | self._pending)
+
+    def namespace_bytes(self, namespaces: Iterable[Tuple[str, ...]]) -> int:
+        """Encoded size of the loaded items in `namespaces`, without re-encoding them."""
+        with self._lock:
+            return sum(self._bytes.get(tuple(namespace), 0) for namespace in namespaces)
+
+    def export_namespaces(self, namespaces: Iterable[Tuple[str, ...]]) -> List[list]:
+        """Remove `namespaces` from the store (loading them from the snapshot first) and
+        return them as [namespace, [[key, value, created_at, updated_at], ...]] sections."""
+        sections = []
+        with self._lock:
+            for namespace in map(tuple, namespaces):
+                self._load_namespace(namespace)
+                self._bytes.pop(namespace, None)
+                items = self._data.pop(namespace, None)
+                if items:
+                    sections.append([list(namespace), [[i.key, i.value, i.created_at, i.updated_at] for i in items.values()]])
+        return sections
+
+    def import_namespaces(self, sections: Iterable[list]):
+        """Replace namespaces with sections returned by `export_namespaces`."""
+        with self._lock:
+            for namespace, items in sections:
+                namespace = tuple(namespace)
+                self._pending.discard(namespace)
+                self._data[namespace] = {
+                    key: Item(value=value, key=key, namespace=namespace, created_at=created_at, updated_at=updated_at)
+                    for key, value, created_at, updated_at in items
+                }
+                self._bytes[namespace] = sum(_item_bytes(key, value) for key, value, _, _ in items)
+
+    @property
+    def pending_namespaces(self) -> int:
+        return len(self._pending)
+
+
+def restore_snapshot(path: str, **kwargs) -> LazySnapshotStore:
+    """Open a snapshot for lazy restore."""
+    return LazySnapshotStore(snapshot_path=path, **kwargs)
+
+
+class PeriodicSnapshotter:
+    """Background thread that snapshots a store every `interval` seconds.
+
+    `on_written` is called with the time.monotonic() at which each successful snapshot began.
+    """
+
+    def __init__(self, store: BaseStore, path: str, interval: float,
+                 on_written: Optional[Callable[[float], None]] = None):
+        self.store = store
+        self.path = path
+        self.interval = interval
+        self.on_written = on_written
+        self.last_snapshot_at: Optional[datetime] = None
+        self._stop_event = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="memory-snapshotter", daemon=True)
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def snapshot_now(self) -> int:
+        started = time.monotonic()
+        if isinstance(self.store, LazySnapshotStore):
+            count = self.store.snapshot(self.path)
+        else:
+            count = write_snapshot(self.store, self.path)
+        self.last_snapshot_at = datetime.now()
+        if self.on_written:
+            self.on_written(started)
+        return count
+
+    def _run(self):
+        while not self._stop_event.wait(self.interval):
+            try:
+                self.snapshot_now()
+            except Exception as e:
+                print(f"Warning: memory snapshot to {self.path} failed: {e}")
+
+    def stop(self, final_snapshot: bool = True):
+        self._stop_event.set()
+        if self._thread.is_alive():
+            self._thread.join()
+        if final_snapshot:
+            self.snapshot_now()
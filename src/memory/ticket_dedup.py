@@ -0,0 +1,323 @@
+import hashlib
+import re
+import threading
+import time
+import weakref
+from collections import Counter, deque
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+from langgraph.store.base import BaseStore
+
+from ..config.settings import (
+    TICKET_DEDUP_THRESHOLD,
+    TICKET_DEDUP_MIN_TOKENS,
+    TICKET_DEDUP_COMMON_SHARE,
+    TICKET_DEDUP_COMMON_MIN,
+    TICKET_DEDUP_NUM_PERM,
+    TICKET_DEDUP_BANDS
+)
+
+
+_WORD = re.compile(r"\w+", re.UNICODE)
+# English function words, plus the framing of a ticket request ("create a ticket to ...")
+_STOPWORDS = {
+    "a", "about", "add", "again", "also", "an", "and", "another", "are", "as", "at", "be", "by", "can",
+    "could", "create", "do", "for", "from", "i", "if", "in", "into", "is", "it", "look", "me", "my",
+    "need", "of", "on", "our", "please", "should", "so", "task", "that", "the", "them", "this", "ticket",
+    "to", "up", "us", "we", "will", "with", "would", "you", "your",
+}
+
+
+def content_tokens(text: str) -> frozenset:
+    """The words of a task that decide which task it is: lowercased, with stopwords
+    and plural 's' dropped."""
+    tokens = set()
+    for word in _WORD.findall(text.lower()):
+        if word in _STOPWORDS:
+            continue
+        if len(word) > 3 and word.endswith("s") and not word.endswith("ss"):
+            word = word[:-1]
+        tokens.add(word)
+    return frozenset(tokens)
+
+
+def _hash_tokens(tokens: Iterable[str]) -> np.ndarray:
+    return np.array(
+        [int.from_bytes(hashlib.blake2b(t.encode("utf-8"), digest_size=8).digest(), "little") for t in tokens],
+        dtype=np.uint64,
+    )
+
+
+class TicketIndex:
+    """MinHash signatures with banded LSH buckets over one user's ticket texts.
+
+    Signatures (over content words) live in one NumPy matrix. Each band's bucket keys
+    are kept sorted (`searchsorted` lookups); rows added since the last re-sort are
+    scanned directly, and the sorted view is rebuilt once that tail grows.
+
+    A candidate merges when its estimated Jaccard similarity reaches `threshold`, and
+    either it keeps every content word of the existing ticket (a restatement may add
+    words), or every word that differs is common in this backlog (in at least
+    `common_share` of the tickets and `common_min` of them), e.g. one frequent verb
+    swapped for another. Swapping any rarer word ("... on iOS" / "... on Android")
+    makes a different task.
+    """
+
+    def __init__(self, num_perm: int = TICKET_DEDUP_NUM_PERM, bands: int = TICKET_DEDUP_BANDS,
+                 threshold: float = TICKET_DEDUP_THRESHOLD, min_tokens: int = TICKET_DEDUP_MIN_TOKENS,
+                 common_share: float = TICKET_DEDUP_COMMON_SHARE, common_min: int = TICKET_DEDUP_COMMON_MIN,
+                 seed: int = 1, capacity: int = 1024):
+        if num_perm % bands:
+            raise ValueError("num_perm must be a multiple of bands")
+        self.num_perm, self.bands, self.rows = num_perm, bands, num_perm // bands
+        self.threshold = threshold
+        self.min_tokens = min_tokens
+        self.common_share = common_share
+        self.common_min = common_min
+        self._lock = threading.RLock()
+
+        rng = np.random.default_rng(seed)
+        # Multiply-shift hash family: h(x) = (a * x + b) >> 32, a odd, wrapping in uint64
+        self._a = rng.integers(1, 2**63, size=num_perm, dtype=np.uint64) | np.uint64(1)
+        self._b = rng.integers(0, 2**63, size=num_perm, dtype=np.uint64)
+        self._band_mix = rng.integers(1, 2**63, size=self.rows, dtype=np.uint64) | np.uint64(1)
+
+        self._signatures = np.zeros((capacity, num_perm), dtype=np.uint32)
+        self._band_keys = np.zeros((capacity, bands), dtype=np.uint64)
+        self._alive = np.zeros(capacity, dtype=bool)
+        self._keys: List[str] = []
+        self._tokens: List[frozenset] = []
+        self._row_of: Dict[str, int] = {}
+        self._size = 0
+        # Number of live tickets containing each content word
+        self._counts: Counter = Counter()
+
+        # Sorted per-band view over rows [0, _indexed)
+        self._indexed = 0
+        self._sorted_keys = np.zeros((bands, 0), dtype=np.uint64)
+        self._sorted_rows = np.zeros((bands, 0), dtype=np.int64)
+
+    def __len__(self):
+        return len(self._row_of)
+
+    def __contains__(self, key: str):
+        return key in self._row_of
+
+    def signature(self, tokens: Iterable[str]) -> Optional[np.ndarray]:
+        hashes = _hash_tokens(sorted(tokens))
+        if not len(hashes):
+            return None
+        with np.errstate(over="ignore"):
+            permuted = (hashes[:, None] * self._a[None, :] + self._b[None, :]) >> np.uint64(32)
+        return permuted.min(axis=0).astype(np.uint32)
+
+    def _band_keys_for(self, signatures: np.ndarray) -> np.ndarray:
+        bands = signatures.reshape(len(signatures), self.bands, self.rows).astype(np.uint64)
+        with np.errstate(over="ignore"):
+            return (bands * self._band_mix).sum(axis=2, dtype=np.uint64)
+
+    def _grow(self, needed: int):
+        capacity = len(self._alive)
+        if needed <= capacity:
+            return
+        while capacity < needed:
+            capacity *= 2
+        for name in ("_signatures", "_band_keys", "_alive"):
+            old = getattr(self, name)
+            new = np.zeros((capacity,) + old.shape[1:], dtype=old.dtype)
+            new[:len(old)] = old
+            setattr(self, name, new)
+
+    def add(self, key: str, text: str):
+        self.add_many([(key, text)])
+
+    def add_many(self, entries: Iterable[Tuple[str, str]]):
+        """Index (ticket key, task text) pairs; re-adding a key replaces its entry."""
+        keys, tokens, signatures = [], [], []
+        # The last entry for a key wins, as when it is re-added later
+        for key, text in dict(entries).items():
+            words = content_tokens(text or "")
+            signature = self.signature(words)
+            if signature is not None:
+                keys.append(key)
+                tokens.append(words)
+                signatures.append(signature)
+        with self._lock:
+            for key in keys:
+                self._drop(key)
+            if not keys:
+                return
+            signatures = np.stack(signatures)
+            start = self._size
+            self._grow(start + len(keys))
+            self._signatures[start:start + len(keys)] = signatures
+            self._band_keys[start:start + len(keys)] = self._band_keys_for(signatures)
+            self._alive[start:start + len(keys)] = True
+            for offset, key in enumerate(keys):
+                self._row_of[key] = start + offset
+                self._counts.update(tokens[offset])
+            self._keys.extend(keys)
+            self._tokens.extend(tokens)
+            self._size += len(keys)
+            if self._size - self._indexed > max(1024, self._indexed // 8):
+                self._reindex()
+
+    def _drop(self, key: str):
+        row = self._row_of.pop(key, None)
+        if row is not None:
+            self._alive[row] = False
+            self._counts.subtract(self._tokens[row])
+
+    def remove(self, key: str):
+        with self._lock:
+            self._drop(key)
+
+    def _reindex(self):
+        keys = self._band_keys[:self._size].T
+        order = np.argsort(keys, axis=1, kind="stable")
+        self._sorted_keys = np.take_along_axis(keys, order, axis=1)
+        self._sorted_rows = order
+        self._indexed = self._size
+
+    def _candidates(self, band_keys: np.ndarray) -> np.ndarray:
+        found = []
+        for band in range(self.bands):
+            column = self._sorted_keys[band]
+            lo = np.searchsorted(column, band_keys[band], side="left")
+            hi = np.searchsorted(column, band_keys[band], side="right")
+            if hi > lo:
+                found.append(self._sorted_rows[band, lo:hi])
+        tail = self._band_keys[self._indexed:self._size]
+        if len(tail):
+            found.append(np.nonzero((tail == band_keys).any(axis=1))[0] + self._indexed)
+        if not found:
+            return np.zeros(0, dtype=np.int64)
+        rows = np.unique(np.concatenate(found))
+        return rows[self._alive[rows]]
+
+    def _common(self, token: str) -> bool:
+        """Whether `token` is frequent enough in this backlog to say little about which task is meant."""
+        count = self._counts[token]
+        return count >= self.common_min and count >= self.common_share * len(self._row_of)
+
+    def _same_task(self, existing: frozenset, words: frozenset) -> bool:
+        missing = existing - words
+        return not missing or all(self._common(token) for token in missing | (words - existing))
+
+    def match(self, text: str) -> Optional[Tuple[str, float]]:
+        """The most similar indexed ticket that `text` restates, with its estimated similarity.
+
+        Texts with fewer than `min_tokens` content words never match: too little is left
+        to tell a restatement from a different task.
+        """
+        words = content_tokens(text or "")
+        if len(words) < self.min_tokens:
+            return None
+        signature = self.signature(words)
+        band_keys = self._band_keys_for(signature[None, :])[0]
+        with self._lock:
+            rows = self._candidates(band_keys)
+            if not len(rows):
+                return None
+            similarity = (self._signatures[rows] == signature).mean(axis=1)
+            for position in np.argsort(-similarity, kind="stable"):
+                if similarity[position] < self.threshold:
+                    break
+                row = rows[position]
+                if self._same_task(self._tokens[row], words):
+                    return self._keys[row], float(similarity[position])
+            return None
+
+
+class DedupStats:
+    """Candidates checked against the index, merges, and lookup latency."""
+
+    def __init__(self, window: int = 10000):
+        self._lock = threading.Lock()
+        self._window = window
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.candidates = 0
+            self.merged = 0
+            self._lookups = deque(maxlen=self._window)
+
+    def record(self, seconds: float, merged: bool):
+        with self._lock:
+            self.candidates += 1
+            self.merged += int(merged)
+            self._lookups.append(seconds)
+
+    def snapshot(self) -> Dict[str, float]:
+        with self._lock:
+            lookups = np.array(self._lookups) if self._lookups else np.zeros(1)
+            return {
+                "candidates": self.candidates,
+                "merged": self.merged,
+                "dedup_rate": self.merged / self.candidates if self.candidates else 0.0,
+                "lookup_p50_ms": float(np.percentile(lookups, 50) * 1000),
+                "lookup_p99_ms": float(np.percentile(lookups, 99) * 1000),
+            }
+
+
+dedup_stats = DedupStats()
+
+
+# One index per (store, user); built from the store the first time a user's tickets are checked
+_indexes: "weakref.WeakKeyDictionary[BaseStore, Dict[str, TicketIndex]]" = weakref.WeakKeyDictionary()
+_indexes_lock = threading.Lock()
+# Per-user locks held while an index is built, so other users' turns are not blocked meanwhile
+_build_locks: "weakref.WeakKeyDictionary[BaseStore, Dict[str, threading.Lock]]" = weakref.WeakKeyDictionary()
+
+
+def ticket_index(store: BaseStore, user_id: str) -> TicketIndex:
+    with _indexes_lock:
+        index = _indexes.setdefault(store, {}).get(user_id)
+        if index is not None:
+            return index
+        build_lock = _build_locks.setdefault(store, {}).setdefault(user_id, threading.Lock())
+
+    # Concurrent turns of the same user wait here rather than indexing the user twice
+    with build_lock:
+        with _indexes_lock:
+            index = _indexes.setdefault(store, {}).get(user_id)
+        if index is not None:
+            return index
+        index = TicketIndex()
+        items = store.search(("ticket", user_id), limit=10**9)
+        index.add_many((item.key, item.value.get("task", "")) for item in items if isinstance(item.value, dict))
+        with _indexes_lock:
+            _indexes.setdefault(store, {})[user_id] = index
+            _build_locks.get(store, {}).pop(user_id, None)
+        return index
+
+
+def discard_ticket_index(store: BaseStore, user_id: str):
+    """Forget a user's index, e.g. after their tickets moved to another store."""
+    with _indexes_lock:
+        _indexes.get(store, {}).pop(user_id, None)
+
+
+def find_duplicate(store: BaseStore, user_id: str, task: str) -> Optional[str]:
+    """Key of an existing ticket that restates `task`, if any. Records dedup stats."""
+    index = ticket_index(store, user_id)
+    started = time.perf_counter()
+    match = index.match(task)
+    dedup_stats.record(time.perf_counter() - started, match is not None)
+    return match[0] if match else None
+
+
+def merge_ticket(existing: Dict[str, Any], new: Dict[str, Any]) -> Dict[str, Any]:
+    """Fold a restated ticket into the existing one: keep its task, fill in new details."""
+    merged = dict(existing)
+    for field in ("time_to_complete", "deadline"):
+        if new.get(field) is not None:
+            merged[field] = new[field]
+    if new.get("status") and new["status"] != "not started":
+        merged["status"] = new["status"]
+    solutions = list(existing.get("solutions") or [])
+    solutions += [s for s in new.get("solutions") or [] if s not in solutions]
+    merged["solutions"] = solutions
+    return merged
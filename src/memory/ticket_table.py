@@ -0,0 +1,212 @@
+import threading
+import time
+import weakref
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Sequence
+
+import numpy as np
+from langgraph.store.base import BaseStore
+
+
+STATUSES = ("not started", "in progress", "done", "archived")
+OPEN_STATUSES = ("not started", "in progress")
+_STATUS_CODE = {status: code for code, status in enumerate(STATUSES)}
+
+
+def _timestamp(value) -> float:
+    if value is None:
+        return np.nan
+    if isinstance(value, str):
+        try:
+            value = datetime.fromisoformat(value)
+        except ValueError:
+            return np.nan
+    return value.timestamp() if isinstance(value, datetime) else float(value)
+
+
+class TicketTable:
+    """Columnar copy of one user's tickets for listing, filtering and aggregation without an LLM.
+
+    Status, deadline, time_to_complete and creation time are NumPy columns (times as
+    epoch seconds, NaN when unset); task texts are interned and referenced by id.
+    """
+
+    def __init__(self, capacity: int = 256):
+        self._lock = threading.RLock()
+        self.status = np.zeros(capacity, dtype=np.int8)
+        self.deadline = np.full(capacity, np.nan)
+        self.time_to_complete = np.full(capacity, np.nan)
+        self.created = np.full(capacity, np.nan)
+        self.task_id = np.zeros(capacity, dtype=np.int32)
+        self.alive = np.zeros(capacity, dtype=bool)
+        self._texts: List[str] = []
+        self._text_ids: Dict[str, int] = {}
+        self._keys: List[Optional[str]] = []
+        self._row_of: Dict[str, int] = {}
+        self._solutions: List[Optional[List[str]]] = []
+
+    def __len__(self):
+        return len(self._row_of)
+
+    def _intern(self, text: str) -> int:
+        text_id = self._text_ids.get(text)
+        if text_id is None:
+            text_id = self._text_ids[text] = len(self._texts)
+            self._texts.append(text)
+        return text_id
+
+    def _grow(self):
+        capacity = len(self.alive) * 2
+        for name in ("status", "deadline", "time_to_complete", "created", "task_id", "alive"):
+            old = getattr(self, name)
+            new = np.full(capacity, np.nan) if old.dtype == np.float64 else np.zeros(capacity, dtype=old.dtype)
+            new[:len(old)] = old
+            setattr(self, name, new)
+
+    def upsert(self, key: str, value: Any, created: Optional[float] = None):
+        """Insert or replace a ticket from its stored value (a TicketDetails dump)."""
+        if isinstance(value, str):
+            value = {"task": value}
+        with self._lock:
+            row = self._row_of.get(key)
+            if row is None:
+                row = len(self._keys)
+                if row == len(self.alive):
+                    self._grow()
+                self._keys.append(key)
+                self._solutions.append(None)
+                self._row_of[key] = row
+                self.created[row] = created if created is not None else time.time()
+            self.status[row] = _STATUS_CODE.get(value.get("status"), 0)
+            self.deadline[row] = _timestamp(value.get("deadline"))
+            ttc = value.get("time_to_complete")
+            self.time_to_complete[row] = np.nan if ttc is None else float(ttc)
+            self.task_id[row] = self._intern(value.get("task") or "")
+            self._solutions[row] = list(value.get("solutions") or [])
+            self.alive[row] = True
+
+    def remove(self, key: str):
+        with self._lock:
+            row = self._row_of.pop(key, None)
+            if row is not None:
+                self.alive[row] = False
+                self._keys[row] = None
+
+    def _mask(self, statuses, due_before, due_after, overdue, now) -> np.ndarray:
+        n = len(self._keys)
+        mask = self.alive[:n].copy()
+        if statuses is not None:
+            mask &= np.isin(self.status[:n], [_STATUS_CODE[s] for s in statuses])
+        deadline = self.deadline[:n]
+        # Comparisons with NaN are False, so tickets without a deadline drop out of date filters
+        with np.errstate(invalid="ignore"):
+            if due_before is not None:
+                mask &= deadline <= _timestamp(due_before)
+            if due_after is not None:
+                mask &= deadline >= _timestamp(due_after)
+            if overdue:
+                mask &= deadline < _timestamp(now or datetime.now())
+                mask &= np.isin(self.status[:n], [_STATUS_CODE[s] for s in OPEN_STATUSES])
+        return mask
+
+    def query(self, statuses: Optional[Sequence[str]] = None, due_before=None, due_after=None,
+              overdue: bool = False, sort_by: str = "deadline", descending: bool = False,
+              limit: Optional[int] = None, now=None) -> List[Dict[str, Any]]:
+        """Filter and sort tickets. `sort_by` is deadline, created, time_to_complete or status;
+        tickets missing the sort value come last."""
+        with self._lock:
+            rows = np.nonzero(self._mask(statuses, due_before, due_after, overdue, now))[0]
+            column = getattr(self, sort_by)[rows].astype(np.float64)
+            primary = -column if descending else column
+            # Missing values last, ties broken by creation time (newest first)
+            order = np.lexsort((-self.created[rows], primary, np.isnan(column)))
+            rows = rows[order[:limit] if limit is not None else order]
+            return [self._row(row) for row in rows]
+
+    def count(self, **filters) -> int:
+        with self._lock:
+            return int(self._mask(filters.get("statuses"), filters.get("due_before"), filters.get("due_after"),
+                                  filters.get("overdue", False), filters.get("now")).sum())
+
+    def aggregate(self, now=None) -> Dict[str, Any]:
+        """Ticket counts per status, overdue count and outstanding estimated minutes."""
+        with self._lock:
+            n = len(self._keys)
+            alive = self.alive[:n]
+            by_status = np.bincount(self.status[:n][alive], minlength=len(STATUSES))
+            open_rows = alive & np.isin(self.status[:n], [_STATUS_CODE[s] for s in OPEN_STATUSES])
+            return {
+                "total": int(alive.sum()),
+                "by_status": {status: int(by_status[code]) for code, status in enumerate(STATUSES)},
+                "overdue": int(self._mask(None, None, None, True, now).sum()),
+                "open_minutes": float(np.nansum(self.time_to_complete[:n][open_rows])),
+            }
+
+    def _row(self, row: int) -> Dict[str, Any]:
+        deadline, ttc = self.deadline[row], self.time_to_complete[row]
+        return {
+            "key": self._keys[row],
+            "task": self._texts[self.task_id[row]],
+            "status": STATUSES[self.status[row]],
+            "deadline": None if np.isnan(deadline) else datetime.fromtimestamp(deadline),
+            "time_to_complete": None if np.isnan(ttc) else int(ttc),
+            "solutions": self._solutions[row],
+        }
+
+
+def format_ticket_line(ticket: Dict[str, Any]) -> str:
+    line = f"- Task: {ticket['task']}, Status: {ticket['status']}"
+    if ticket["deadline"]:
+        line += f", Deadline: {ticket['deadline'].strftime('%Y-%m-%d')}"
+    return line
+
+
+def compact_ticket_summary(table: TicketTable, limit: int) -> str:
+    """Prompt-sized ticket list: open tickets by deadline first, then the rest, capped at `limit`."""
+    if not len(table):
+        return "No tickets yet."
+    tickets = table.query(statuses=OPEN_STATUSES, limit=limit)
+    if len(tickets) < limit:
+        tickets += table.query(statuses=("done", "archived"), sort_by="created", descending=True,
+                               limit=limit - len(tickets))
+    lines = [format_ticket_line(ticket) for ticket in tickets]
+    if len(table) > len(tickets):
+        stats = table.aggregate()
+        counts = ", ".join(f"{n} {status}" for status, n in stats["by_status"].items() if n)
+        lines.insert(0, f"(Showing {len(tickets)} of {stats['total']} tickets: {counts}; {stats['overdue']} overdue)")
+    return "\n".join(lines)
+
+
+# One table per (store, user); built from the store the first time a user's tickets are read
+_tables: "weakref.WeakKeyDictionary[BaseStore, Dict[str, TicketTable]]" = weakref.WeakKeyDictionary()
+_tables_lock = threading.Lock()
+# Per-user locks held while a table is built, so other users' turns are not blocked meanwhile
+_build_locks: "weakref.WeakKeyDictionary[BaseStore, Dict[str, threading.Lock]]" = weakref.WeakKeyDictionary()
+
+
+def ticket_table(store: BaseStore, user_id: str) -> TicketTable:
+    with _tables_lock:
+        table = _tables.setdefault(store, {}).get(user_id)
+        if table is not None:
+            return table
+        build_lock = _build_locks.setdefault(store, {}).setdefault(user_id, threading.Lock())
+
+    # Concurrent turns of the same user wait here rather than building the table twice
+    with build_lock:
+        with _tables_lock:
+            table = _tables.setdefault(store, {}).get(user_id)
+        if table is not None:
+            return table
+        table = TicketTable()
+        for item in store.search(("ticket", user_id), limit=10**9):
+            table.upsert(item.key, item.value, created=item.created_at.timestamp())
+        with _tables_lock:
+            _tables.setdefault(store, {})[user_id] = table
+            _build_locks.get(store, {}).pop(user_id, None)
+        return table
+
+
+def discard_ticket_table(store: BaseStore, user_id: str):
+    """Forget a user's table, e.g. after their tickets moved to another store."""
+    with _tables_lock:
+        _tables.get(store, {}).pop(user_id, None)
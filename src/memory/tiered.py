@@ -0,0 +1,359 @@
+import os
+import tempfile
+import threading
+import time
+from collections import OrderedDict, defaultdict, deque
+from contextlib import contextmanager
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+from urllib.parse import quote, unquote
+
+from langgraph.checkpoint.memory import MemorySaver
+
+from .snapshot import pack, unpack
+from .ticket_dedup import discard_ticket_index
+from .ticket_table import discard_ticket_table
+
+
+# Namespace types kept per user, i.e. (type, user_id)
+MEMORY_NAMESPACE_TYPES = ("profile", "ticket", "instructions", "userfeedback", "productresearch")
+_SUFFIX = ".spill"
+
+
+def _tuples(obj):
+    """msgpack returns lists; the checkpointer's entries are tuples."""
+    if isinstance(obj, list):
+        return tuple(_tuples(x) for x in obj)
+    if isinstance(obj, dict):
+        return {k: _tuples(v) for k, v in obj.items()}
+    return obj
+
+
+def _sized(obj) -> int:
+    if isinstance(obj, (bytes, str)):
+        return len(obj)
+    if isinstance(obj, (tuple, list)):
+        return sum(_sized(x) for x in obj)
+    if isinstance(obj, dict):
+        return sum(_sized(k) + _sized(v) for k, v in obj.items())
+    return 8
+
+
+def _percentile_ms(values, pct) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))] * 1000
+
+
+class _UserState:
+    __slots__ = ("threads", "bytes", "in_flight", "last_used")
+
+    def __init__(self):
+        self.threads = set()
+        self.bytes = 0
+        self.in_flight = 0
+        self.last_used = time.monotonic()
+
+
+class IndexedMemorySaver(MemorySaver):
+    """MemorySaver that indexes writes and blobs by thread and keeps each thread's size,
+    so a thread can be measured, exported or imported without scanning every thread."""
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self._lock = threading.RLock()
+        self._write_keys: Dict[str, set] = defaultdict(set)
+        self._blob_keys: Dict[str, set] = defaultdict(set)
+        self._thread_bytes: Dict[str, int] = defaultdict(int)
+
+    def _entry_bytes(self, thread_id: str, checkpoint_ns: str, checkpoint_id: str, blob_keys) -> int:
+        entry = self.storage.get(thread_id, {}).get(checkpoint_ns, {}).get(checkpoint_id)
+        size = _sized(checkpoint_id) + _sized(entry) if entry is not None else 0
+        return size + sum(_sized(self.blobs.get(key, ())) for key in blob_keys)
+
+    def put(self, config, checkpoint, metadata, new_versions):
+        thread_id = config["configurable"]["thread_id"]
+        checkpoint_ns = config["configurable"]["checkpoint_ns"]
+        blob_keys = [(thread_id, checkpoint_ns, channel, version) for channel, version in new_versions.items()]
+        with self._lock:
+            before = self._entry_bytes(thread_id, checkpoint_ns, checkpoint["id"], blob_keys)
+            result = super().put(config, checkpoint, metadata, new_versions)
+            self._blob_keys[thread_id].update(blob_keys)
+            self._thread_bytes[thread_id] += self._entry_bytes(thread_id, checkpoint_ns, checkpoint["id"], blob_keys) - before
+        return result
+
+    def put_writes(self, config, writes, task_id, task_path=""):
+        thread_id = config["configurable"]["thread_id"]
+        key = (thread_id, config["configurable"].get("checkpoint_ns", ""), config["configurable"]["checkpoint_id"])
+        with self._lock:
+            before = _sized(self.writes.get(key, {}))
+            super().put_writes(config, writes, task_id, task_path)
+            self._write_keys[thread_id].add(key)
+            self._thread_bytes[thread_id] += _sized(self.writes.get(key, {})) - before
+
+    def delete_thread(self, thread_id: str):
+        self.export_thread(thread_id)
+
+    def thread_bytes(self, thread_ids: Iterable[str]) -> int:
+        with self._lock:
+            return sum(self._thread_bytes.get(thread_id, 0) for thread_id in thread_ids)
+
+    def export_thread(self, thread_id: str) -> Optional[list]:
+        """Remove a thread and return it as [thread_id, storage, writes, blobs], or None if unknown."""
+        with self._lock:
+            storage = self.storage.pop(thread_id, None)
+            writes = [[list(k), list(self.writes.pop(k).items())] for k in self._write_keys.pop(thread_id, ()) if k in self.writes]
+            blobs = [[list(k), self.blobs.pop(k)] for k in self._blob_keys.pop(thread_id, ()) if k in self.blobs]
+            self._thread_bytes.pop(thread_id, None)
+        if not (storage or writes or blobs):
+            return None
+        return [thread_id, {ns: dict(c) for ns, c in (storage or {}).items()}, writes, blobs]
+
+    def import_thread(self, entry: list) -> str:
+        """Put back a thread returned by `export_thread` (possibly after a msgpack round trip)."""
+        thread_id, storage, writes, blobs = entry
+        with self._lock:
+            for checkpoint_ns, checkpoints in storage.items():
+                self.storage[thread_id][checkpoint_ns].update(_tuples(checkpoints))
+            for key, entries in writes:
+                key = tuple(key)
+                self.writes[key] = {_tuples(k): _tuples(v) for k, v in entries}
+                self._write_keys[thread_id].add(key)
+            for key, value in blobs:
+                key = tuple(key)
+                self.blobs[key] = _tuples(value)
+                self._blob_keys[thread_id].add(key)
+            self._thread_bytes[thread_id] = (
+                _sized(self.storage.get(thread_id, {}))
+                + sum(_sized(self.writes[k]) for k in self._write_keys[thread_id])
+                + sum(_sized(self.blobs[k]) for k in self._blob_keys[thread_id])
+            )
+        return thread_id
+
+
+class TieredMemory:
+    """Keeps recently active users' memory in RAM and spills idle users to disk.
+
+    A user's hot state is their store namespaces plus the checkpoint history of
+    their threads in the in-memory checkpointer. Turns `acquire` the user (reloading
+    them if spilled) and `release` them afterwards, at which point least recently
+    used idle users are spilled until resident memory is under `max_bytes`.
+
+    `store` is a LazySnapshotStore and `saver` an IndexedMemorySaver; both move data
+    in and out under their own locks and keep running sizes for the memory cap.
+
+    Snapshots only cover resident users, so a spilled user's file is their durable
+    copy. With `keep_until_snapshot`, a reloaded user's file is kept until
+    `snapshot_written` reports a snapshot that includes them, so a crash in between
+    restarts from the spill file rather than losing the user.
+    """
+
+    def __init__(self, store, saver, spill_dir: str, max_bytes: int,
+                 max_users: Optional[int] = None, idle_seconds: Optional[float] = None,
+                 keep_until_snapshot: bool = False):
+        self.store = store
+        self.saver = saver
+        self.spill_dir = spill_dir
+        self.max_bytes = max_bytes
+        self.max_users = max_users
+        self.idle_seconds = idle_seconds
+        self.keep_until_snapshot = keep_until_snapshot
+        os.makedirs(spill_dir, exist_ok=True)
+
+        self._lock = threading.RLock()
+        self._resident: "OrderedDict[str, _UserState]" = OrderedDict()
+        self._resident_bytes = 0
+        # Users spilled by an earlier process are reloaded from here on first use
+        self._spilled = {unquote(name[:-len(_SUFFIX)]) for name in os.listdir(spill_dir) if name.endswith(_SUFFIX)}
+        # Reloaded users whose spill file is kept until a snapshot includes them, with reload times
+        self._kept: Dict[str, float] = {}
+        self._evictions = deque(maxlen=10000)
+        self._reloads = deque(maxlen=10000)
+        self._counts = defaultdict(int)
+
+    def _path(self, user_id: str) -> str:
+        return os.path.join(self.spill_dir, quote(user_id, safe="") + _SUFFIX)
+
+    # Moving a user's data in and out of the store and checkpointer
+
+    def _namespaces(self, user_id: str) -> List[Tuple[str, ...]]:
+        return [(kind, user_id) for kind in MEMORY_NAMESPACE_TYPES]
+
+    def _take_user(self, user_id: str, threads: Iterable[str]) -> Dict[str, Any]:
+        # Namespaces not yet restored from a snapshot are loaded first, so the spill file is complete
+        namespaces = self.store.export_namespaces(self._namespaces(user_id))
+        discard_ticket_index(self.store, user_id)
+        discard_ticket_table(self.store, user_id)
+        thread_data = [entry for entry in map(self.saver.export_thread, threads) if entry is not None]
+        return {"user_id": user_id, "namespaces": namespaces, "threads": thread_data}
+
+    def _put_user(self, payload: Dict[str, Any]) -> set:
+        self.store.import_namespaces(payload["namespaces"])
+        return {self.saver.import_thread(entry) for entry in payload["threads"]}
+
+    def _measure(self, user_id: str, threads: Iterable[str]) -> int:
+        # Both sides keep running sizes, so this does not re-encode anything
+        return self.store.namespace_bytes(self._namespaces(user_id)) + self.saver.thread_bytes(threads)
+
+    # Spilling and reloading
+
+    def _spill(self, user_id: str, state: _UserState):
+        started = time.perf_counter()
+        data = pack(self._take_user(user_id, state.threads))
+        fd, tmp_path = tempfile.mkstemp(dir=self.spill_dir, prefix=".spill-")
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        os.replace(tmp_path, self._path(user_id))
+        self._kept.pop(user_id, None)
+        self._evictions.append(time.perf_counter() - started)
+        self._counts["evictions"] += 1
+        self._counts["spilled_bytes"] += len(data)
+
+    def _reload(self, user_id: str) -> set:
+        started = time.perf_counter()
+        path = self._path(user_id)
+        with open(path, "rb") as f:
+            threads = self._put_user(unpack(f.read()))
+        if self.keep_until_snapshot:
+            self._kept[user_id] = time.monotonic()
+        else:
+            os.remove(path)
+        self._reloads.append(time.perf_counter() - started)
+        self._counts["reloads"] += 1
+        return threads
+
+    def _discard_spill_file(self, user_id: str):
+        self._kept.pop(user_id, None)
+        path = self._path(user_id)
+        if os.path.exists(path):
+            os.remove(path)
+
+    def _evict_over_limits(self):
+        """Spill least recently used idle users while over the byte or user cap. Holds the lock."""
+        now = time.monotonic()
+        for user_id in list(self._resident):
+            state = self._resident[user_id]
+            over = (self._resident_bytes > self.max_bytes
+                    or (self.max_users is not None and len(self._resident) > self.max_users))
+            idle = self.idle_seconds is not None and now - state.last_used > self.idle_seconds
+            if not (over or idle):
+                break
+            if state.in_flight:
+                continue
+            self._spill(user_id, state)
+            del self._resident[user_id]
+            self._resident_bytes -= state.bytes
+            self._spilled.add(user_id)
+
+    # Public API
+
+    def acquire(self, user_id: str, thread_id: Optional[str] = None):
+        """Pin a user for a turn, reloading them from disk if they were spilled."""
+        with self._lock:
+            state = self._resident.get(user_id)
+            if state is None:
+                state = _UserState()
+                if user_id in self._spilled:
+                    state.threads = self._reload(user_id)
+                    self._spilled.discard(user_id)
+                self._resident[user_id] = state
+            self._resident.move_to_end(user_id)
+            state.in_flight += 1
+            state.last_used = time.monotonic()
+            if thread_id is not None:
+                state.threads.add(thread_id)
+
+    def release(self, user_id: str):
+        """Unpin a user after a turn and spill idle users if memory is over the cap."""
+        with self._lock:
+            state = self._resident.get(user_id)
+            if state is None:
+                return
+            state.in_flight -= 1
+            state.last_used = time.monotonic()
+            size = self._measure(user_id, state.threads)
+            self._resident_bytes += size - state.bytes
+            state.bytes = size
+            self._evict_over_limits()
+
+    @contextmanager
+    def user(self, user_id: str, thread_id: Optional[str] = None):
+        self.acquire(user_id, thread_id)
+        try:
+            yield
+        finally:
+            self.release(user_id)
+
+    def evict(self, user_id: str) -> bool:
+        """Spill one user now; False if they are mid-turn or not resident."""
+        with self._lock:
+            state = self._resident.get(user_id)
+            if state is None or state.in_flight:
+                return False
+            self._spill(user_id, state)
+            del self._resident[user_id]
+            self._resident_bytes -= state.bytes
+            self._spilled.add(user_id)
+            return True
+
+    def detach(self, user_id: str) -> set:
+        """Make a user resident and stop tracking them (their data is about to move elsewhere).
+        Returns their known thread ids."""
+        with self._lock:
+            state = self._resident.pop(user_id, None)
+            if state is not None:
+                self._resident_bytes -= state.bytes
+                threads = state.threads
+            elif user_id in self._spilled:
+                self._spilled.discard(user_id)
+                threads = self._reload(user_id)
+            else:
+                threads = set()
+            # A file left behind would restore the user here after a restart
+            self._discard_spill_file(user_id)
+            return threads
+
+    def adopt(self, user_id: str, thread_ids: Iterable[str]):
+        """Start tracking a user whose data was put into the store and checkpointer directly.
+
+        The imported data is current, so a spill file left from an earlier stay here is
+        dropped rather than reloaded over it.
+        """
+        with self._lock:
+            self._spilled.discard(user_id)
+            self._discard_spill_file(user_id)
+        self.acquire(user_id)
+        with self._lock:
+            self._resident[user_id].threads.update(thread_ids)
+        self.release(user_id)
+
+    def snapshot_written(self, started: float):
+        """Delete the kept spill files of users reloaded before a snapshot that began at
+        `started` (a time.monotonic() value), since that snapshot includes them."""
+        with self._lock:
+            for user_id, reloaded_at in list(self._kept.items()):
+                if reloaded_at < started:
+                    self._discard_spill_file(user_id)
+
+    def users(self) -> Dict[str, set]:
+        """Every user this tier holds, resident or spilled, with their known thread ids
+        (spilled users' threads are only known once they are reloaded)."""
+        with self._lock:
+            held = {user_id: set(state.threads) for user_id, state in self._resident.items()}
+            held.update((user_id, set()) for user_id in self._spilled)
+            return held
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "resident_users": len(self._resident),
+                "resident_bytes": self._resident_bytes,
+                "spilled_users": len(self._spilled),
+                "evictions": self._counts["evictions"],
+                "reloads": self._counts["reloads"],
+                "spilled_bytes_written": self._counts["spilled_bytes"],
+                "evict_p50_ms": _percentile_ms(self._evictions, 50),
+                "evict_p99_ms": _percentile_ms(self._evictions, 99),
+                "reload_p50_ms": _percentile_ms(self._reloads, 50),
+                "reload_p99_ms": _percentile_ms(self._reloads, 99),
+            }
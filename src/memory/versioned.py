@@ -0,0 +1,90 @@
+import threading
+import weakref
+from collections import defaultdict
+from typing import Any, Dict, List, Optional, Tuple
+
+from langgraph.store.base import BaseStore, Item
+
+
+class WriteStats:
+    """Counters for compare-and-set writes to the memory store."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self._counts = defaultdict(lambda: defaultdict(int))
+
+    def record(self, namespace_type: str, outcome: str):
+        with self._lock:
+            self._counts[namespace_type][outcome] += 1
+
+    def snapshot(self) -> Dict[str, Dict[str, int]]:
+        with self._lock:
+            return {name: dict(counts) for name, counts in self._counts.items()}
+
+    def conflict_rate(self, namespace_type: Optional[str] = None) -> float:
+        """Fraction of compare-and-set attempts that lost to a concurrent write."""
+        counts = self.snapshot()
+        selected = [counts[namespace_type]] if namespace_type else list(counts.values())
+        attempts = sum(c.get("committed", 0) + c.get("conflict", 0) for c in selected)
+        return sum(c.get("conflict", 0) for c in selected) / attempts if attempts else 0.0
+
+
+write_stats = WriteStats()
+
+
+class _VersionTable:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.versions: Dict[Tuple[Tuple[str, ...], str], int] = {}
+
+
+# One version table per store instance; versions live as long as the store does
+_tables: "weakref.WeakKeyDictionary[BaseStore, _VersionTable]" = weakref.WeakKeyDictionary()
+_tables_lock = threading.Lock()
+
+
+def _table(store: BaseStore) -> _VersionTable:
+    with _tables_lock:
+        table = _tables.get(store)
+        if table is None:
+            table = _tables[store] = _VersionTable()
+        return table
+
+
+def get_versioned(store: BaseStore, namespace: Tuple[str, ...], key: str) -> Tuple[Optional[Item], int]:
+    """Read an item together with the version to pass to `compare_and_put`."""
+    table = _table(store)
+    with table.lock:
+        version = table.versions.get((tuple(namespace), key), 0)
+        item = store.get(namespace, key)
+    return item, version
+
+
+def search_versioned(store: BaseStore, namespace: Tuple[str, ...], **kwargs) -> Tuple[List[Item], Dict[str, int]]:
+    """Search a namespace and return the items plus each key's current version."""
+    table = _table(store)
+    with table.lock:
+        items = store.search(namespace, **kwargs)
+        versions = {item.key: table.versions.get((tuple(item.namespace), item.key), 0) for item in items}
+    return items, versions
+
+
+def compare_and_put(store: BaseStore, namespace: Tuple[str, ...], key: str, value: Any, expected_version: int) -> bool:
+    """Write `value` only if the key is still at `expected_version` (0 = never written).
+
+    Returns False, without writing, when another writer got there first.
+    """
+    table = _table(store)
+    version_key = (tuple(namespace), key)
+    with table.lock:
+        if table.versions.get(version_key, 0) != expected_version:
+            write_stats.record(namespace[0], "conflict")
+            return False
+        store.put(namespace, key, value)
+        table.versions[version_key] = expected_version + 1
+    write_stats.record(namespace[0], "committed")
+    return True
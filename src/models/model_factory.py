@@ -0,0 +1,126 @@
+import threading
+import time
+from collections import defaultdict
+from typing import Any, Dict, Optional
+
+import groq
+from langchain_core.callbacks import CallbackManagerForLLMRun
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_groq import ChatGroq
+
+from ..config.settings import MODEL_TIERS, NODE_MODEL_TIERS, ESCALATION_TIER
+from ..harness.delegating import DelegatingChatModel
+from .reasoning import apply_reasoning_policy
+
+
+class TierStats:
+    """Thread-safe call, latency, token and escalation counters per model tier."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self._stats = defaultdict(lambda: defaultdict(float))
+
+    def record(self, tier: str, node: str, elapsed: float, usage: Optional[Dict[str, int]], escalated: bool = False):
+        with self._lock:
+            for key in (tier, f"{tier}/{node}"):
+                stats = self._stats[key]
+                stats["calls"] += 1
+                stats["seconds"] += elapsed
+                stats["escalations"] += 1 if escalated else 0
+                for field, value in (usage or {}).items():
+                    if isinstance(value, (int, float)):
+                        stats[field] += value
+
+    def snapshot(self) -> Dict[str, Dict[str, float]]:
+        with self._lock:
+            return {key: dict(values) for key, values in self._stats.items()}
+
+
+tier_stats = TierStats()
+
+
+def _usage(result) -> Dict[str, int]:
+    """Token usage of a result, after stripping its reasoning (counted separately)."""
+    reasoning_tokens = apply_reasoning_policy(result)
+    usage = dict(result.generations[0].message.usage_metadata or {}) if result.generations else {}
+    usage["reasoning_tokens"] = reasoning_tokens
+    return usage
+
+
+# Errors meaning the smaller model produced something unusable (a rejected tool call,
+# unparseable or invalid output); auth, rate-limit and connection errors are not retried
+# on the larger model. ValueError covers Pydantic validation and output parser errors.
+_MALFORMED_ERRORS = (
+    ValueError,
+    groq.BadRequestError,
+    groq.UnprocessableEntityError,
+    groq.APIResponseValidationError,
+)
+
+
+def _needs_escalation(result) -> bool:
+    """A fast-tier answer is unusable when it has neither text nor a tool call."""
+    message = result.generations[0].message if result.generations else None
+    return message is None or (not message.content and not getattr(message, "tool_calls", None))
+
+
+class TieredChatModel(DelegatingChatModel):
+    """Chat model for one node on one tier, escalating to a larger model on failure.
+
+    If `escalation` is set, a call whose output is malformed (rejected or invalid, or
+    an empty message) on the assigned tier is retried once on the escalation model.
+    """
+    tier: str
+    node: str
+    escalation: Optional[Any] = None
+    escalation_tier: Optional[str] = None
+
+    def _generate(self, messages, stop=None, run_manager: Optional[CallbackManagerForLLMRun] = None, **kwargs):
+        started = time.perf_counter()
+        try:
+            result = self._call_model(self.inner, messages, stop, run_manager, **kwargs)
+        except _MALFORMED_ERRORS as e:
+            if self.escalation is None:
+                raise
+            print(f"Warning: {self.node} failed on '{self.tier}' tier ({e}); escalating")
+            result = None
+
+        usage = _usage(result) if result else None
+        escalate = self.escalation is not None and (result is None or _needs_escalation(result))
+        tier_stats.record(self.tier, self.node, time.perf_counter() - started, usage, escalated=escalate)
+        if not escalate:
+            return result
+
+        started = time.perf_counter()
+        result = self._call_model(self.escalation, messages, stop, run_manager, **kwargs)
+        tier_stats.record(self.escalation_tier, self.node, time.perf_counter() - started, _usage(result))
+        return result
+
+
+def build_tier_model(tier: str) -> BaseChatModel:
+    """Create the provider model configured for a tier."""
+    return ChatGroq(**{k: v for k, v in MODEL_TIERS[tier].items() if v is not None})
+
+
+def build_node_model(node: str, node_tiers: Optional[Dict[str, str]] = None, make_model=None) -> TieredChatModel:
+    """Create the model for a graph node according to its tier assignment.
+
+    `make_model(tier, label)` builds the underlying model (defaults to the provider model
+    for the tier); the graph uses it to wrap models for recording or replay.
+    """
+    tier = (node_tiers or NODE_MODEL_TIERS).get(node, ESCALATION_TIER)
+    make_model = make_model or (lambda tier, label: build_tier_model(tier))
+    escalation = None
+    if tier != ESCALATION_TIER:
+        escalation = make_model(ESCALATION_TIER, f"{node}:escalated")
+    return TieredChatModel(
+        inner=make_model(tier, node),
+        tier=tier,
+        node=node,
+        escalation=escalation,
+        escalation_tier=ESCALATION_TIER if escalation is not None else None,
+    )
@@ -0,0 +1,49 @@
+import re
+
+from langchain_core.outputs import ChatResult
+
+from ..config.settings import KEEP_REASONING_CONTENT
+
+
+_THINK_BLOCK = re.compile(r"<think>.*?</think>\s*", re.DOTALL | re.IGNORECASE)
+# A trace cut off by max_tokens never gets its closing tag
+_UNTERMINATED_THINK = re.compile(r"<think>.*\Z", re.DOTALL | re.IGNORECASE)
+
+
+def strip_reasoning(text):
+    """Remove <think>...</think> reasoning traces from model output."""
+    if not isinstance(text, str) or "<think>" not in text.lower():
+        return text
+    return _UNTERMINATED_THINK.sub("", _THINK_BLOCK.sub("", text)).strip()
+
+
+def apply_reasoning_policy(result: ChatResult) -> int:
+    """Strip reasoning from every generation in place; returns the reasoning token count.
+
+    Inline <think> traces are removed from the content and parsed traces are dropped
+    from `additional_kwargs` (unless KEEP_REASONING_CONTENT), so neither reaches the
+    checkpointed conversation, the memory store or the user. Provider-reported
+    reasoning tokens are used when available, otherwise they are estimated.
+    """
+    reasoning_tokens = 0
+    for generation in result.generations:
+        message = generation.message
+        reasoning_chars = 0
+
+        if isinstance(message.content, str) and "<think>" in message.content.lower():
+            stripped = strip_reasoning(message.content)
+            reasoning_chars += len(message.content) - len(stripped)
+            message.content = stripped
+            generation.text = stripped
+
+        parsed = message.additional_kwargs.get("reasoning_content")
+        if parsed:
+            reasoning_chars += len(parsed)
+            if not KEEP_REASONING_CONTENT:
+                message.additional_kwargs.pop("reasoning_content")
+
+        usage = getattr(message, "usage_metadata", None) or {}
+        reported = (usage.get("output_token_details") or {}).get("reasoning")
+        # Roughly four characters per token when the provider does not report a count
+        reasoning_tokens += reported if reported else reasoning_chars // 4
+    return reasoning_tokens
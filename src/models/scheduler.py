@@ -0,0 +1,198 @@
+import contextvars
+import itertools
+import threading
+import time
+from collections import defaultdict, deque
+from contextlib import contextmanager
+from typing import Any, Dict, List, Optional
+
+from langchain_core.callbacks import CallbackManagerForLLMRun
+from langchain_core.messages import BaseMessage
+from langchain_core.outputs import ChatResult
+
+from ..config.settings import (
+    LLM_MAX_CONCURRENCY,
+    PRIORITY_AGING_SECONDS,
+    PRIORITY_DEADLINE_SECONDS
+)
+from ..harness.delegating import DelegatingChatModel
+
+
+# Priority classes, most urgent first
+INTERACTIVE = "interactive"
+BACKGROUND = "background"
+BULK = "bulk"
+PRIORITY_CLASSES = (INTERACTIVE, BACKGROUND, BULK)
+_RANK = {priority: rank for rank, priority in enumerate(PRIORITY_CLASSES)}
+
+_priority_override: contextvars.ContextVar = contextvars.ContextVar("llm_priority", default=None)
+
+
+@contextmanager
+def llm_priority(priority: str):
+    """Run every LLM call made in this context (e.g. a batch job's graph runs) at `priority`."""
+    if priority not in _RANK:
+        raise ValueError(f"Unknown priority class '{priority}', expected one of {PRIORITY_CLASSES}")
+    token = _priority_override.set(priority)
+    try:
+        yield
+    finally:
+        _priority_override.reset(token)
+
+
+class _Waiter:
+    __slots__ = ("priority", "enqueued", "deadline", "seq", "event")
+
+    def __init__(self, priority, enqueued, deadline, seq):
+        self.priority = priority
+        self.enqueued = enqueued
+        self.deadline = deadline
+        self.seq = seq
+        self.event = threading.Event()
+
+
+class SchedulerStats:
+    """Calls and queue time per priority class."""
+
+    def __init__(self, window: int = 10000):
+        self._lock = threading.Lock()
+        self._window = window
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self._queued = defaultdict(lambda: deque(maxlen=self._window))
+            self._calls = defaultdict(int)
+            self._aged = defaultdict(int)
+
+    def record(self, priority: str, queued: float, aged: bool):
+        with self._lock:
+            self._queued[priority].append(queued)
+            self._calls[priority] += 1
+            self._aged[priority] += int(aged)
+
+    def snapshot(self) -> Dict[str, Dict[str, float]]:
+        with self._lock:
+            result = {}
+            for priority, queued in self._queued.items():
+                ordered = sorted(queued)
+                pick = lambda pct: ordered[min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))]
+                result[priority] = {
+                    "calls": self._calls[priority],
+                    "aged": self._aged[priority],
+                    "queue_mean_ms": sum(ordered) / len(ordered) * 1000,
+                    "queue_p50_ms": pick(50) * 1000,
+                    "queue_p95_ms": pick(95) * 1000,
+                    "queue_max_ms": ordered[-1] * 1000,
+                }
+            return result
+
+
+class LLMScheduler:
+    """Admits at most `max_concurrency` LLM calls at once, in priority order.
+
+    When a slot frees up, the waiting call with the best effective class runs next,
+    earliest deadline first within a class. A call's effective class improves by one
+    for every `aging_seconds` it has waited, so bulk work cannot starve; once promoted
+    its deadline is that class's, counted from when it was enqueued. With
+    `fifo=True` classes are ignored (first come, first served), for comparison.
+    """
+
+    def __init__(self, max_concurrency: int, aging_seconds: float = PRIORITY_AGING_SECONDS,
+                 deadlines: Optional[Dict[str, float]] = None, fifo: bool = False):
+        self.max_concurrency = max_concurrency
+        self.aging_seconds = aging_seconds
+        self.deadlines = dict(PRIORITY_DEADLINE_SECONDS, **(deadlines or {}))
+        self.fifo = fifo
+        self.stats = SchedulerStats()
+        self._lock = threading.Lock()
+        self._running = 0
+        self._waiting: List[_Waiter] = []
+        self._seq = itertools.count()
+
+    def _effective_rank(self, waiter: _Waiter, now: float) -> int:
+        aged = int((now - waiter.enqueued) / self.aging_seconds) if self.aging_seconds else 0
+        return max(0, _RANK[waiter.priority] - aged)
+
+    def _key(self, waiter: _Waiter, now: float):
+        if self.fifo:
+            return (waiter.seq,)
+        rank = self._effective_rank(waiter, now)
+        deadline = waiter.deadline
+        if rank < _RANK[waiter.priority]:
+            # A promoted call competes on the new class's deadline, counted from when it was enqueued
+            deadline = min(deadline, waiter.enqueued + self.deadlines[PRIORITY_CLASSES[rank]])
+        return (rank, deadline, waiter.seq)
+
+    @contextmanager
+    def slot(self, priority: str, deadline: Optional[float] = None):
+        """Hold one unit of the concurrency budget; `deadline` is seconds from now."""
+        enqueued = time.monotonic()
+        deadline = enqueued + (deadline if deadline is not None else self.deadlines[priority])
+        waiter = None
+        with self._lock:
+            if self._running < self.max_concurrency and not self._waiting:
+                self._running += 1
+            else:
+                waiter = _Waiter(priority, enqueued, deadline, next(self._seq))
+                self._waiting.append(waiter)
+        aged = False
+        if waiter is not None:
+            waiter.event.wait()
+            aged = self._effective_rank(waiter, time.monotonic()) < _RANK[priority]
+        self.stats.record(priority, time.monotonic() - enqueued, aged)
+        try:
+            yield
+        finally:
+            self._release()
+
+    def _release(self):
+        with self._lock:
+            if not self._waiting:
+                self._running -= 1
+                return
+            now = time.monotonic()
+            best = min(self._waiting, key=lambda waiter: self._key(waiter, now))
+            self._waiting.remove(best)
+        # The freed slot passes straight to the chosen waiter
+        best.event.set()
+
+    @property
+    def queued(self) -> Dict[str, int]:
+        with self._lock:
+            counts = defaultdict(int)
+            for waiter in self._waiting:
+                counts[waiter.priority] += 1
+            return dict(counts)
+
+
+_default_scheduler: Optional[LLMScheduler] = None
+_default_lock = threading.Lock()
+
+
+def get_scheduler() -> Optional[LLMScheduler]:
+    """The process-wide scheduler shared by every graph (None when LLM_MAX_CONCURRENCY is 0)."""
+    global _default_scheduler
+    if not LLM_MAX_CONCURRENCY:
+        return None
+    with _default_lock:
+        if _default_scheduler is None:
+            _default_scheduler = LLMScheduler(LLM_MAX_CONCURRENCY)
+        return _default_scheduler
+
+
+class ScheduledChatModel(DelegatingChatModel):
+    """Runs each call of the inner model through an `LLMScheduler` slot at a priority class."""
+    scheduler: Any
+    priority: str = INTERACTIVE
+
+    def _generate(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Optional[CallbackManagerForLLMRun] = None,
+        **kwargs: Any,
+    ) -> ChatResult:
+        priority = _priority_override.get() or self.priority
+        with self.scheduler.slot(priority):
+            return self._call_model(self.inner, messages, stop, run_manager, **kwargs)
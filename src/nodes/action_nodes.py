@@ -1,8 +1,7 @@
 from typing import List, Dict, Any
-from langchain_core.runnables import RunnableConfig
+from langchain_core.runnables import Runnable, RunnableConfig
 from langchain_core.messages import SystemMessage, HumanMessage, AIMessage, ToolMessage
-from langgraph.graph import MessagesState
-from langchain_groq import ChatGroq
+from langgraph.graph import MessagesState, END
 
 from ..memory.memory_manager import load_memories
 from ..models.schemas import UpdateMemory
@@ -13,8 +12,17 @@ from ..prompts.system_prompts import (
 )
 
 
-def decide_initial_action(state: MessagesState, config: RunnableConfig, store, model: ChatGroq):
-    """Decides the initial action: search, update memory, or respond."""
+# Tools each node's model is bound to. The graph binds them once at build time and passes
+# the bound runnables in, so the schemas are not converted again on every call.
+DECIDE_ACTION_TOOLS = [UpdateMemory, web_search, wiki_search, arxiv_search]
+SEARCH_RESULT_TOOLS = [UpdateMemory]
+
+
+def decide_initial_action(state: MessagesState, config: RunnableConfig, store, bound_model: Runnable):
+    """Decides the initial action: search, update memory, or respond.
+
+    `bound_model` is the model bound to DECIDE_ACTION_TOOLS.
+    """
     user_id = config["configurable"]["user_id"]
     mems = load_memories(user_id, store)
 
@@ -29,16 +37,17 @@ def decide_initial_action(state: MessagesState, config: RunnableConfig, store, m
     conversation_messages = [SystemMessage(content=system_msg_content)] + state["messages"]
     print("conversation_messages", conversation_messages)
 
-    response = model.bind_tools(
-        [UpdateMemory, web_search, wiki_search, arxiv_search],
-    ).invoke(conversation_messages)
+    response = bound_model.invoke(conversation_messages)
 
     print("response", response)
     return {"messages": [response]}
 
 
-def handle_search_result(state: MessagesState, config: RunnableConfig, store, model: ChatGroq):
-    """Processes search results and decides on next steps (e.g., update memory)."""
+def handle_search_result(state: MessagesState, config: RunnableConfig, store, bound_model: Runnable):
+    """Processes search results and decides on next steps (e.g., update memory).
+
+    `bound_model` is the model bound to SEARCH_RESULT_TOOLS.
+    """
     user_id = config["configurable"]["user_id"]
     messages = state["messages"]
 
@@ -101,7 +110,7 @@ def handle_search_result(state: MessagesState, config: RunnableConfig, store, mo
         chat_history=chat_history_summary
     )
 
-    response = model.bind_tools([UpdateMemory]).invoke([
+    response = bound_model.invoke([
         SystemMessage(content=system_msg_content),
         HumanMessage(content=f"Search results received: {consolidated_search_results_content[:1000]}...")
     ])
@@ -113,7 +122,7 @@ def route_from_initial_action(state: MessagesState) -> str:
     """Routes from decide_initial_action node based on its tool call."""
     message = state['messages'][-1]
     if not message.tool_calls:
-        return "END"
+        return END
 
     tool_call = message.tool_calls[0]
     tool_name = tool_call['name']
@@ -132,19 +141,19 @@ def route_from_initial_action(state: MessagesState) -> str:
             return "update_productresearch"
         else:
             print(f"Warning: Unknown update_type '{update_type}' in route_from_initial_action")
-            return "END"
+            return END
     elif tool_name in ['web_search', 'wiki_search', 'arxiv_search']:
         return "execute_search_tools"
     else:
         print(f"Warning: Unknown tool '{tool_name}' in route_from_initial_action")
-        return "END"
+        return END
 
 
 def route_from_search_handling(state: MessagesState) -> str:
     """Routes from handle_search_result node."""
     message = state['messages'][-1]
     if not message.tool_calls:
-        return "END"
+        return END
 
     tool_call = message.tool_calls[0]
     tool_name = tool_call['name']
@@ -164,7 +173,7 @@ def route_from_search_handling(state: MessagesState) -> str:
             return "update_productresearch"
         else:
             print(f"Warning: Unknown update_type '{update_type}' in route_from_search_handling")
-            return "END"
+            return END
     else:
         print(f"Warning: Unexpected tool '{tool_name}' from handle_search_result")
-        return "END"
+        return END
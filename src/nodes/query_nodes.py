@@ -0,0 +1,102 @@
+import re
+from datetime import datetime, timedelta
+from typing import Any, Dict, Optional
+
+from langchain_core.runnables import RunnableConfig
+from langchain_core.messages import AIMessage, HumanMessage
+from langgraph.graph import MessagesState
+
+from ..config.settings import TICKET_LIST_LIMIT
+from ..memory.ticket_table import OPEN_STATUSES, ticket_table
+
+
+# Only explicit requests to list the user's own tickets, matched against the whole message;
+# questions that merely mention tasks ("Which tickets relate to authentication?") go to the model
+_SUBJECT = r"(?:tickets?|tasks?|to-?dos?|backlog)(?: list)?"
+_STATUS = r"(?:open|current|outstanding|pending|overdue|late|done|completed|finished|closed|archived|in progress|not started)"
+_WHEN = r"(?:due )?(?:today|this week|next week)"
+_QUALIFIER = rf"(?: (?:that are |which are )?(?:{_STATUS}|{_WHEN}))*"
+_EXPLICIT_LISTING = re.compile("|".join([
+    # "show me my tickets", "list all my open tasks due this week", "can you show me my backlog"
+    rf"(?:(?:can|could) you )?(?:please )?(?:show|list|display|give|get)(?: me)?(?: all)?(?: of)? (?:my|our)(?: {_STATUS})* {_SUBJECT}{_QUALIFIER}(?: please)?",
+    # "what are my open tickets", "what's on my backlog"
+    rf"what(?:'s| is| are)(?: on)?(?: all)? (?:my|our)(?: {_STATUS})* {_SUBJECT}{_QUALIFIER}",
+    # "what's overdue this week", "what is due today"
+    rf"what(?:'s| is)(?: overdue| late| due)(?: {_WHEN})?",
+    # "which of my tickets are overdue", "which tasks are due this week"
+    rf"(?:which|what)(?: of)? (?:my |our )?{_SUBJECT} (?:are|is) (?:{_STATUS}|{_WHEN}|due)(?: {_WHEN})?",
+    # "how many open tickets do I have"
+    rf"how many(?: {_STATUS})* {_SUBJECT} do (?:i|we) have{_QUALIFIER}",
+]))
+
+
+def parse_ticket_query(text: str, now: Optional[datetime] = None) -> Optional[Dict[str, Any]]:
+    """Filters for a plain ticket-listing request, or None if the message needs the model."""
+    text = re.sub(r"\s+", " ", text.lower().replace("\u2019", "'")).strip(" ?.!")
+    if not _EXPLICIT_LISTING.fullmatch(text):
+        return None
+
+    now = now or datetime.now()
+    today = now.replace(hour=0, minute=0, second=0, microsecond=0)
+    filters: Dict[str, Any] = {"statuses": OPEN_STATUSES}
+    if re.search(r"\b(overdue|late)\b", text):
+        filters["overdue"] = True
+    if "today" in text:
+        filters["due_before"] = today + timedelta(days=1)
+    elif "this week" in text:
+        filters["due_before"] = today + timedelta(days=7 - today.weekday())
+    elif "next week" in text:
+        filters["due_after"] = today + timedelta(days=7 - today.weekday())
+        filters["due_before"] = filters["due_after"] + timedelta(days=7)
+
+    if re.search(r"\b(done|completed|finished|closed)\b", text):
+        filters["statuses"] = ("done",)
+    elif "in progress" in text:
+        filters["statuses"] = ("in progress",)
+    elif "not started" in text:
+        filters["statuses"] = ("not started",)
+    elif "archived" in text:
+        filters["statuses"] = ("archived",)
+    elif re.search(r"\ball\b", text):
+        filters["statuses"] = None
+    return filters
+
+
+def answer_ticket_query(state: MessagesState, config: RunnableConfig, store):
+    """Answers a ticket listing request straight from the ticket table, without an LLM call."""
+    user_id = config["configurable"]["user_id"]
+    filters = parse_ticket_query(state["messages"][-1].content)
+    table = ticket_table(store, user_id)
+
+    now = datetime.now()
+    tickets = table.query(limit=TICKET_LIST_LIMIT, now=now, **filters)
+    total = table.count(now=now, **filters)
+    if not tickets:
+        return {"messages": [AIMessage(content="You have no matching tickets.")]}
+
+    lines = [f"You have {total} matching ticket{'s' if total != 1 else ''}:"]
+    for ticket in tickets:
+        line = f"- {ticket['task']} [{ticket['status']}]"
+        if ticket["deadline"]:
+            overdue = ticket["deadline"] < now and ticket["status"] in OPEN_STATUSES
+            line += f", due {ticket['deadline'].strftime('%Y-%m-%d')}{' (overdue)' if overdue else ''}"
+        if ticket["time_to_complete"]:
+            line += f", ~{ticket['time_to_complete']} min"
+        lines.append(line)
+    if total > len(tickets):
+        lines.append(f"...and {total - len(tickets)} more.")
+    return {"messages": [AIMessage(content="\n".join(lines))]}
+
+
+def route_from_start(state: MessagesState, config: RunnableConfig, store) -> str:
+    """Sends plain ticket listing requests to the table, everything else to the model.
+
+    Users with stored ticket instructions always get the model, which applies them.
+    """
+    message = state["messages"][-1]
+    if not (isinstance(message, HumanMessage) and isinstance(message.content, str) and parse_ticket_query(message.content)):
+        return "decide_initial_action"
+    instructions = store.get(("instructions", config["configurable"]["user_id"]), "instructions")
+    if instructions is not None and instructions.value.get("memory"):
+        return "decide_initial_action"
+    return "answer_ticket_query"
@@ -6,7 +6,12 @@ from langchain_core.messages import SystemMessage, HumanMessage, ToolMessage, me
 from langgraph.graph import MessagesState
 from langchain_groq import ChatGroq
 
+from ..config.settings import MEMORY_WRITE_MAX_RETRIES, TICKET_DEDUP_ENABLED
+from ..memory.ticket_dedup import find_duplicate, merge_ticket, ticket_index
+from ..memory.ticket_table import ticket_table
+from ..memory.versioned import compare_and_put, get_versioned, search_versioned, write_stats
 from ..models.schemas import Profile, TicketDetails
+from ..models.reasoning import strip_reasoning
 from ..prompts.system_prompts import (
     TRUSTCALL_INSTRUCTION,
     CREATE_INSTRUCTIONS_PROMPT,
@@ -21,30 +26,36 @@ def update_userprofile(state: MessagesState, config: RunnableConfig, store, prof
 
     messages_for_extraction = [m for m in state["messages"] if not isinstance(m, ToolMessage)]
 
-    trustcall_input_messages = list(merge_message_runs(
-        messages=[SystemMessage(content=TRUSTCALL_INSTRUCTION.format(time=datetime.now().isoformat()))] +
-        messages_for_extraction
-    ))
+    tool_call_id = state["messages"][-1].tool_calls[0]['id']
 
-    existing_items = store.search(namespace)
-    existing_memories = ([(existing_item.key, "Profile", existing_item.value)
-                         for existing_item in existing_items]
-                        if existing_items else None)
+    # Optimistic concurrency: re-run the extraction against the fresh profile if another turn wrote first
+    for _ in range(MEMORY_WRITE_MAX_RETRIES + 1):
+        # Built per attempt: trustcall appends the existing docs to the system message in place
+        trustcall_input_messages = list(merge_message_runs(
+            messages=[SystemMessage(content=TRUSTCALL_INSTRUCTION.format(time=datetime.now().isoformat()))] +
+            messages_for_extraction
+        ))
 
-    result = profile_extractor.invoke({
-        "messages": trustcall_input_messages,
-        "existing": existing_memories
-    })
+        existing_items, versions = search_versioned(store, namespace)
+        existing_memories = ([(existing_item.key, "Profile", existing_item.value)
+                             for existing_item in existing_items]
+                            if existing_items else None)
 
-    tool_call_id = state["messages"][-1].tool_calls[0]['id']
+        result = profile_extractor.invoke({
+            "messages": trustcall_input_messages,
+            "existing": existing_memories
+        })
+
+        if not result["responses"]:
+            return {"messages": [ToolMessage(content="No profile information extracted to update.", tool_call_id=tool_call_id)]}
 
-    if result["responses"]:
         profile_data = result["responses"][0]
-        store.put(namespace, "user_profile_doc", profile_data)
-        confirmation_msg = f"User profile updated. Current profile details: {profile_data.model_dump_json(indent=2)}"
-        return {"messages": [ToolMessage(content=confirmation_msg, tool_call_id=tool_call_id)]}
-    else:
-        return {"messages": [ToolMessage(content="No profile information extracted to update.", tool_call_id=tool_call_id)]}
+        if compare_and_put(store, namespace, "user_profile_doc", profile_data, versions.get("user_profile_doc", 0)):
+            confirmation_msg = f"User profile updated. Current profile details: {profile_data.model_dump_json(indent=2)}"
+            return {"messages": [ToolMessage(content=confirmation_msg, tool_call_id=tool_call_id)]}
+
+    write_stats.record("profile", "exhausted")
+    return {"messages": [ToolMessage(content="Profile was changed concurrently and could not be updated. Please try again.", tool_call_id=tool_call_id)]}
 
 
 def update_tickets(state: MessagesState, config: RunnableConfig, store, ticket_extractor):
@@ -53,37 +64,71 @@ def update_tickets(state: MessagesState, config: RunnableConfig, store, ticket_e
 
     messages_for_extraction = [m for m in state["messages"] if not isinstance(m, ToolMessage)]
 
-    trustcall_input_messages = list(merge_message_runs(
-        messages=[SystemMessage(content=TRUSTCALL_INSTRUCTION.format(time=datetime.now().isoformat()))] +
-        messages_for_extraction
-    ))
-
-    existing_items = store.search(namespace)
-    existing_memories = ([(existing_item.key, "TicketDetails", existing_item.value)
-                         for existing_item in existing_items]
-                        if existing_items else None)
-
-    result = ticket_extractor.invoke({
-        "messages": trustcall_input_messages,
-        "existing": existing_memories
-    })
-
     tool_call_id = state["messages"][-1].tool_calls[0]['id']
 
-    if result["responses"]:
-        updated_ticket_details_for_user = []
+    updated_ticket_details_for_user = []
+    # Tickets still to be written; None means all of them (first attempt)
+    conflicted = None
+    for _ in range(MEMORY_WRITE_MAX_RETRIES + 1):
+        # Built per attempt: trustcall appends the existing docs to the system message in place
+        trustcall_input_messages = list(merge_message_runs(
+            messages=[SystemMessage(content=TRUSTCALL_INSTRUCTION.format(time=datetime.now().isoformat()))] +
+            messages_for_extraction
+        ))
+
+        existing_items, versions = search_versioned(store, namespace)
+        existing_memories = ([(existing_item.key, "TicketDetails", existing_item.value)
+                             for existing_item in existing_items]
+                            if existing_items else None)
+
+        result = ticket_extractor.invoke({
+            "messages": trustcall_input_messages,
+            "existing": existing_memories
+        })
+
+        lost = set()
         for r_meta, ticket_obj in zip(result["response_metadata"], result["responses"]):
             ticket_id = r_meta.get("json_doc_id", str(uuid.uuid4()))
-            store.put(namespace, ticket_id, ticket_obj.model_dump())
+            ticket = ticket_obj.model_dump()
+            version = versions.get(ticket_id, 0)
+            merged = False
+
+            # A new ticket that restates an existing one is merged into it instead of inserted
+            if TICKET_DEDUP_ENABLED and ticket_id not in versions and ticket_id not in ticket_index(store, user_id):
+                duplicate_id = find_duplicate(store, user_id, ticket["task"])
+                if duplicate_id is not None:
+                    existing_item, existing_version = get_versioned(store, namespace, duplicate_id)
+                    if existing_item is None:
+                        ticket_index(store, user_id).remove(duplicate_id)
+                    else:
+                        ticket_id, version, merged = duplicate_id, existing_version, True
+                        ticket = merge_ticket(existing_item.value, ticket)
+
+            # On a retry only the tickets that lost the race are re-applied
+            if conflicted is not None and ticket_id not in conflicted:
+                continue
+            if not compare_and_put(store, namespace, ticket_id, ticket, version):
+                lost.add(ticket_id)
+                continue
+            ticket_table(store, user_id).upsert(ticket_id, ticket)
+            if TICKET_DEDUP_ENABLED:
+                ticket_index(store, user_id).add(ticket_id, ticket["task"])
             detail_str = (
-                f" - Task: {ticket_obj.task}\n"
-                f" Status: {ticket_obj.status}\n"
-                f" Time to complete: {ticket_obj.time_to_complete or 'N/A'} minutes\n"
-                f" Deadline: {ticket_obj.deadline.isoformat() if ticket_obj.deadline else 'N/A'}\n"
-                f" Solutions: {', '.join(ticket_obj.solutions) if ticket_obj.solutions else 'None listed'}"
+                f" - Task: {ticket['task']}{' (merged into existing ticket)' if merged else ''}\n"
+                f" Status: {ticket['status']}\n"
+                f" Time to complete: {ticket['time_to_complete'] or 'N/A'} minutes\n"
+                f" Deadline: {ticket['deadline'].isoformat() if ticket['deadline'] else 'N/A'}\n"
+                f" Solutions: {', '.join(ticket['solutions']) if ticket['solutions'] else 'None listed'}"
             )
             updated_ticket_details_for_user.append(detail_str)
 
+        if not lost:
+            break
+        conflicted = lost
+    else:
+        write_stats.record("ticket", "exhausted")
+
+    if updated_ticket_details_for_user:
         confirmation_msg = "Ticket(s) processed. Details:\n" + "\n".join(updated_ticket_details_for_user)
         return {"messages": [ToolMessage(content=confirmation_msg, tool_call_id=tool_call_id)]}
     else:
@@ -102,39 +147,44 @@ def update_generic_memory(
     namespace = (memory_type, user_id)
     key = memory_type
 
-    current_memory_doc = store.get(namespace, key)
-    current_memory_content = current_memory_doc.value.get("memory", "") if current_memory_doc else ""
-
     relevant_history = state["messages"][-5:-1]
     formatted_history = "\n".join([f"{m.type}: {m.content}" for m in relevant_history])
+    tool_call_id = state["messages"][-1].tool_calls[0]['id']
 
-    if memory_type == "instructions":
-        system_msg_content = prompt_template.format(
-            current_instructions=current_memory_content,
-            relevant_user_input=formatted_history
-        )
-    elif memory_type == "productresearch":
-        system_msg_content = prompt_template.format(
-            current_productresearch=current_memory_content,
-            relevant_inputs=formatted_history
-        )
-    else:  # userfeedback
-        system_msg_content = prompt_template.format(
-            current_feedback=current_memory_content,
-            relevant_user_input=formatted_history
-        )
-
-    new_memory_response = model.invoke([
-        SystemMessage(content=system_msg_content),
-        HumanMessage(content="Please generate the updated content based on the provided information.")
-    ])
-    new_memory_content = new_memory_response.content
-
-    store.put(namespace, key, {"memory": new_memory_content})
+    # Optimistic concurrency: if another turn rewrote this memory meanwhile, redo the rewrite on the new version
+    for _ in range(MEMORY_WRITE_MAX_RETRIES + 1):
+        current_memory_doc, version = get_versioned(store, namespace, key)
+        current_memory_content = current_memory_doc.value.get("memory", "") if current_memory_doc else ""
 
-    tool_call_id = state["messages"][-1].tool_calls[0]['id']
-    confirmation_msg = f"{memory_type.capitalize()} memory has been updated. New content:\n---\n{new_memory_content}\n---"
-    return {"messages": [ToolMessage(content=confirmation_msg, tool_call_id=tool_call_id)]}
+        if memory_type == "instructions":
+            system_msg_content = prompt_template.format(
+                current_instructions=current_memory_content,
+                relevant_user_input=formatted_history
+            )
+        elif memory_type == "productresearch":
+            system_msg_content = prompt_template.format(
+                current_productresearch=current_memory_content,
+                relevant_inputs=formatted_history
+            )
+        else:  # userfeedback
+            system_msg_content = prompt_template.format(
+                current_feedback=current_memory_content,
+                relevant_user_input=formatted_history
+            )
+
+        new_memory_response = model.invoke([
+            SystemMessage(content=system_msg_content),
+            HumanMessage(content="Please generate the updated content based on the provided information.")
+        ])
+        # Never persist reasoning traces: they would be resent with every later prompt
+        new_memory_content = strip_reasoning(new_memory_response.content)
+
+        if compare_and_put(store, namespace, key, {"memory": new_memory_content}, version):
+            confirmation_msg = f"{memory_type.capitalize()} memory has been updated. New content:\n---\n{new_memory_content}\n---"
+            return {"messages": [ToolMessage(content=confirmation_msg, tool_call_id=tool_call_id)]}
+
+    write_stats.record(memory_type, "exhausted")
+    return {"messages": [ToolMessage(content=f"{memory_type.capitalize()} memory was changed concurrently and could not be updated. Please try again.", tool_call_id=tool_call_id)]}
 
 
 def update_instructions(state: MessagesState, config: RunnableConfig, store, model: ChatGroq):
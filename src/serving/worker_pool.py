@@ -0,0 +1,402 @@
+import bisect
+import hashlib
+import itertools
+import multiprocessing as mp
+import os
+import queue
+import threading
+from collections import defaultdict
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional
+
+from langchain_core.messages import HumanMessage
+
+from ..config.settings import MEMORY_SPILL_DIR
+from ..memory.ticket_dedup import discard_ticket_index
+from ..memory.ticket_table import discard_ticket_table
+from ..memory.tiered import MEMORY_NAMESPACE_TYPES
+
+
+def _hash(value: str) -> int:
+    return int.from_bytes(hashlib.md5(value.encode("utf-8")).digest()[:8], "big")
+
+
+class HashRing:
+    """Consistent hash ring with virtual nodes, mapping user ids to worker ids."""
+
+    def __init__(self, nodes=(), replicas: int = 128):
+        self.replicas = replicas
+        self._ring: List[int] = []
+        self._owners: Dict[int, Any] = {}
+        for node in nodes:
+            self.add(node)
+
+    def add(self, node):
+        for i in range(self.replicas):
+            point = _hash(f"{node}#{i}")
+            bisect.insort(self._ring, point)
+            self._owners[point] = node
+
+    def remove(self, node):
+        for i in range(self.replicas):
+            point = _hash(f"{node}#{i}")
+            self._ring.remove(point)
+            del self._owners[point]
+
+    def node_for(self, key: str):
+        if not self._ring:
+            raise ValueError("Hash ring has no nodes")
+        index = bisect.bisect(self._ring, _hash(key)) % len(self._ring)
+        return self._owners[self._ring[index]]
+
+    def copy(self):
+        ring = HashRing(replicas=self.replicas)
+        ring._ring = list(self._ring)
+        ring._owners = dict(self._owners)
+        return ring
+
+
+def worker_spill_dir(worker_id) -> Optional[str]:
+    """Each worker's own subdirectory of MEMORY_SPILL_DIR (None if spilling is off).
+
+    Workers must not share a spill directory: each one treats every file there as a
+    user it holds.
+    """
+    return os.path.join(MEMORY_SPILL_DIR, f"worker-{worker_id}") if MEMORY_SPILL_DIR else None
+
+
+def default_graph_factory(worker_id=None):
+    from ..graph.manager_graph import ManagerAIGraph
+    return ManagerAIGraph(snapshot_path=None, spill_dir=worker_spill_dir(worker_id))
+
+
+def _held_users(ai_graph, threads_by_user: Dict[str, set]) -> Dict[str, List[str]]:
+    """Every user whose data this worker holds, with their thread ids.
+
+    Covers users restored from a snapshot or spill directory that have not spoken
+    since startup, not only users routed here by the supervisor.
+    """
+    held = {user_id: set(thread_ids) for user_id, thread_ids in threads_by_user.items()}
+    for namespace in ai_graph.across_thread_memory.namespaces():
+        if len(namespace) == 2 and namespace[0] in MEMORY_NAMESPACE_TYPES:
+            held.setdefault(namespace[1], set())
+    tiered_memory = getattr(ai_graph, "tiered_memory", None)
+    if tiered_memory is not None:
+        for user_id, thread_ids in tiered_memory.users().items():
+            held.setdefault(user_id, set()).update(thread_ids)
+    return {user_id: sorted(thread_ids) for user_id, thread_ids in held.items()}
+
+
+def _export_user(ai_graph, user_id: str, thread_ids) -> Dict[str, Any]:
+    """Remove a user's namespaces and threads from this worker and return them."""
+    tiered_memory = getattr(ai_graph, "tiered_memory", None)
+    if tiered_memory is not None:
+        # Reload the user if spilled; they stop being tracked here
+        thread_ids = set(thread_ids) | tiered_memory.detach(user_id)
+    store = ai_graph.across_thread_memory
+    namespaces = store.export_namespaces([(kind, user_id) for kind in MEMORY_NAMESPACE_TYPES])
+    discard_ticket_index(store, user_id)
+    discard_ticket_table(store, user_id)
+
+    # In-memory checkpoints, so the conversation history moves with the user
+    saver = ai_graph.within_thread_memory
+    threads = [entry for entry in map(saver.export_thread, thread_ids) if entry is not None]
+    return {"namespaces": namespaces, "threads": threads}
+
+
+def _import_user(ai_graph, user_id: str, payload: Dict[str, Any]) -> set:
+    """Put an exported user into this worker; returns their thread ids."""
+    ai_graph.across_thread_memory.import_namespaces(payload["namespaces"])
+    thread_ids = {ai_graph.within_thread_memory.import_thread(entry) for entry in payload["threads"]}
+
+    tiered_memory = getattr(ai_graph, "tiered_memory", None)
+    if tiered_memory is not None:
+        tiered_memory.adopt(user_id, thread_ids)
+    return thread_ids
+
+
+def _worker_main(worker_id, requests, responses, graph_factory, threads_per_worker):
+    """Worker process: owns one compiled graph and its store shard."""
+    ai_graph = graph_factory(worker_id)
+    executor = ThreadPoolExecutor(max_workers=threads_per_worker)
+    # Threads seen per user on this worker (the in-memory checkpointer has no user index)
+    threads_by_user: Dict[str, set] = defaultdict(set)
+
+    def run_turn(request_id, user_id, thread_id, message):
+        try:
+            config = {"configurable": {"thread_id": thread_id, "user_id": user_id}}
+            result = ai_graph.invoke({"messages": [HumanMessage(content=message)]}, config)
+            responses.put((request_id, True, result["messages"][-1].content))
+        except Exception as e:
+            responses.put((request_id, False, repr(e)))
+
+    while True:
+        request_id, op, payload = requests.get()
+        if op == "turn":
+            user_id, thread_id, _ = payload
+            threads_by_user[user_id].add(thread_id)
+            executor.submit(run_turn, request_id, *payload)
+            continue
+        try:
+            if op == "ping":
+                result = worker_id
+            elif op == "users":
+                result = _held_users(ai_graph, threads_by_user)
+            elif op == "export":
+                result = {user_id: _export_user(ai_graph, user_id, set(thread_ids) | threads_by_user.get(user_id, set()))
+                          for user_id, thread_ids in payload.items()}
+                for user_id in payload:
+                    threads_by_user.pop(user_id, None)
+            elif op == "import":
+                for user_id, user_payload in payload.items():
+                    threads_by_user[user_id] |= _import_user(ai_graph, user_id, user_payload)
+                result = len(payload)
+            elif op == "stop":
+                executor.shutdown(wait=True)
+                if hasattr(ai_graph, "close"):
+                    ai_graph.close()
+                responses.put((request_id, True, worker_id))
+                # Tells the supervisor's collector thread to exit
+                responses.put((None, True, None))
+                return
+            else:
+                raise ValueError(f"Unknown worker operation '{op}'")
+            responses.put((request_id, True, result))
+        except Exception as e:
+            responses.put((request_id, False, repr(e)))
+
+
+class _Worker:
+    def __init__(self, worker_id, ctx, graph_factory, threads_per_worker):
+        self.worker_id = worker_id
+        self.requests = ctx.Queue()
+        self.responses = ctx.Queue()
+        self.process = ctx.Process(
+            target=_worker_main,
+            args=(worker_id, self.requests, self.responses, graph_factory, threads_per_worker),
+            name=f"manager-ai-worker-{worker_id}",
+            daemon=True,
+        )
+        # Set on the first response / when the supervisor stops the worker / when the process is found dead
+        self.ready = False
+        self.stopping = False
+        self.dead = False
+
+
+class WorkerPool:
+    """Supervisor for N worker processes, each with its own graph and store shard.
+
+    Requests are routed by consistent hashing of `user_id`, so a user's memory and
+    threads live on exactly one worker and no cross-process locking is needed. Adding
+    or removing a worker migrates only the users whose owner changes.
+
+    A worker that exits unexpectedly has its outstanding requests failed and is
+    restarted under the same id; users it held in memory (but not in its spill
+    directory) are lost.
+
+    Each worker has its own LLM scheduler, so the pool runs up to
+    num_workers * LLM_MAX_CONCURRENCY model calls at once.
+    """
+
+    def __init__(self, num_workers: int, graph_factory: Callable = default_graph_factory,
+                 threads_per_worker: int = 8, start_method: str = "spawn", replicas: int = 128):
+        self._ctx = mp.get_context(start_method)
+        self.graph_factory = graph_factory
+        self.threads_per_worker = threads_per_worker
+        self.ring = HashRing(replicas=replicas)
+        self.workers: Dict[int, _Worker] = {}
+        self._ids = itertools.count()
+        self._worker_ids = itertools.count()
+        # request id -> (worker, future)
+        self._pending: Dict[int, tuple] = {}
+        self._pending_lock = threading.Lock()
+
+        # In-flight turns per user and users being migrated; new turns wait while paused
+        self._route_lock = threading.Condition()
+        self._in_flight: Dict[str, int] = defaultdict(int)
+        self._migrating: set = set()
+        self._paused = False
+
+        started = [self._start_worker() for _ in range(num_workers)]
+        self._wait_ready(started)
+        for worker_id in started:
+            self.ring.add(worker_id)
+
+    def _start_worker(self) -> int:
+        worker_id = next(self._worker_ids)
+        self._spawn(worker_id)
+        return worker_id
+
+    def _spawn(self, worker_id: int):
+        worker = _Worker(worker_id, self._ctx, self.graph_factory, self.threads_per_worker)
+        worker.process.start()
+        threading.Thread(target=self._collect, args=(worker,), daemon=True).start()
+        threading.Thread(target=self._watch, args=(worker,), daemon=True).start()
+        self.workers[worker_id] = worker
+
+    def _wait_ready(self, worker_ids):
+        """Block until the workers have built their graphs, so the first turns do not pay for it."""
+        for future in [self._send(self.workers[worker_id], "ping", None) for worker_id in worker_ids]:
+            future.result()
+
+    def _watch(self, worker):
+        """Fail a worker's outstanding requests and restart it if its process dies."""
+        worker.process.join()
+        if worker.stopping:
+            return
+        with self._pending_lock:
+            worker.dead = True
+            lost = [request_id for request_id, (owner, _) in self._pending.items() if owner is worker]
+            futures = [self._pending.pop(request_id)[1] for request_id in lost]
+        error = RuntimeError(f"Worker {worker.worker_id} exited with code {worker.process.exitcode}")
+        for future in futures:
+            future.set_exception(error)
+        # Nothing reads this queue any more; don't block interpreter exit flushing it
+        worker.requests.cancel_join_thread()
+        if not worker.ready:
+            # Crashed while building its graph; restarting would only crash again
+            print(f"Warning: worker {worker.worker_id} exited with code {worker.process.exitcode} during startup")
+            return
+        print(f"Warning: worker {worker.worker_id} exited with code {worker.process.exitcode}; restarting it")
+        with self._route_lock:
+            if self.workers.get(worker.worker_id) is worker:
+                self._spawn(worker.worker_id)
+
+    def _collect(self, worker):
+        """Resolve futures from one worker's response queue."""
+        while True:
+            try:
+                request_id, ok, payload = worker.responses.get(timeout=0.5)
+            except queue.Empty:
+                if worker.dead:
+                    return
+                continue
+            if request_id is None:
+                return
+            worker.ready = True
+            with self._pending_lock:
+                _, future = self._pending.pop(request_id, (None, None))
+            if future is not None:
+                if ok:
+                    future.set_result(payload)
+                else:
+                    future.set_exception(RuntimeError(payload))
+
+    def _send(self, worker: _Worker, op: str, payload) -> Future:
+        future = Future()
+        request_id = next(self._ids)
+        with self._pending_lock:
+            if worker.dead:
+                future.set_exception(RuntimeError(f"Worker {worker.worker_id} has exited"))
+                return future
+            self._pending[request_id] = (worker, future)
+        worker.requests.put((request_id, op, payload))
+        return future
+
+    def submit(self, user_id: str, thread_id: str, message: str) -> Future:
+        """Route one turn to the worker that owns `user_id`; resolves to the reply text."""
+        with self._route_lock:
+            while self._paused or user_id in self._migrating:
+                self._route_lock.wait()
+            worker = self.workers[self.ring.node_for(user_id)]
+            self._in_flight[user_id] += 1
+
+        future = self._send(worker, "turn", (user_id, thread_id, message))
+        future.add_done_callback(lambda _: self._turn_done(user_id))
+        return future
+
+    def _turn_done(self, user_id: str):
+        with self._route_lock:
+            self._in_flight[user_id] -= 1
+            self._route_lock.notify_all()
+
+    def invoke(self, user_id: str, thread_id: str, message: str, timeout: Optional[float] = None) -> str:
+        return self.submit(user_id, thread_id, message).result(timeout)
+
+    def _rebalance(self, new_ring: HashRing) -> int:
+        """Move users whose owner differs under `new_ring`; returns how many moved.
+
+        Each worker reports the users it actually holds, so users restored from a
+        snapshot or spill directory move too, not only users routed since startup.
+        If any move fails, users are put back on their old workers, the ring is left
+        unchanged and the error is raised.
+        """
+        with self._route_lock:
+            # Hold new turns while workers list their users, so none is missed
+            self._paused = True
+        moves = defaultdict(dict)
+        moving = set()
+        try:
+            listings = {worker_id: self._send(worker, "users", None) for worker_id, worker in self.workers.items()}
+            for worker_id, listing in listings.items():
+                for user_id, thread_ids in listing.result().items():
+                    new = new_ring.node_for(user_id)
+                    # Copies held by a worker that does not own the user are unreachable; leave them
+                    if self.ring.node_for(user_id) == worker_id and new != worker_id:
+                        moves[(worker_id, new)][user_id] = thread_ids
+            moving = {user_id for users in moves.values() for user_id in users}
+        finally:
+            with self._route_lock:
+                self._migrating |= moving
+                self._paused = False
+                self._route_lock.notify_all()
+
+        with self._route_lock:
+            while any(self._in_flight[user_id] for user_id in moving):
+                self._route_lock.wait()
+
+        moved = []
+        try:
+            for (old, new), users in moves.items():
+                exported = self._send(self.workers[old], "export", users).result()
+                try:
+                    self._send(self.workers[new], "import", exported).result()
+                except Exception:
+                    # The old worker no longer has them; put them back before giving up
+                    self._send(self.workers[old], "import", exported).result()
+                    raise
+                moved.append((old, new, users))
+        except Exception:
+            # The ring stays as it was, so undo the moves that did succeed
+            for old, new, users in reversed(moved):
+                exported = self._send(self.workers[new], "export", users).result()
+                self._send(self.workers[old], "import", exported).result()
+            raise
+        else:
+            with self._route_lock:
+                self.ring = new_ring
+        finally:
+            with self._route_lock:
+                self._migrating -= moving
+                self._route_lock.notify_all()
+        return len(moving)
+
+    def add_worker(self) -> int:
+        """Start a worker and migrate the users it now owns. Returns the new worker id."""
+        worker_id = self._start_worker()
+        self._wait_ready([worker_id])
+        new_ring = self.ring.copy()
+        new_ring.add(worker_id)
+        try:
+            self._rebalance(new_ring)
+        except Exception:
+            self._stop_worker(worker_id)
+            raise
+        return worker_id
+
+    def remove_worker(self, worker_id: int):
+        """Migrate a worker's users to their new owners and stop it."""
+        new_ring = self.ring.copy()
+        new_ring.remove(worker_id)
+        self._rebalance(new_ring)
+        self._stop_worker(worker_id)
+
+    def _stop_worker(self, worker_id: int):
+        worker = self.workers.pop(worker_id)
+        worker.stopping = True
+        self._send(worker, "stop", None).result()
+        worker.process.join()
+
+    def close(self):
+        for worker_id in list(self.workers):
+            self._stop_worker(worker_id)
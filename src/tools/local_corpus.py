@@ -0,0 +1,203 @@
+"""
+Offline full-text index (SQLite FTS5) of Wikipedia / arXiv dump extracts.
+
+Import JSON-lines extracts (WikiExtractor output or the arXiv metadata snapshot) with:
+
+    python -m src.tools.local_corpus import --db data/corpus.db --source wikipedia wiki_extract.jsonl
+    python -m src.tools.local_corpus import --db data/corpus.db --source arxiv arxiv-metadata.jsonl
+    python -m src.tools.local_corpus search --db data/corpus.db --source arxiv "graph neural networks"
+
+Re-importing is incremental: unchanged documents are skipped, changed ones replaced.
+"""
+
+import argparse
+import hashlib
+import json
+import math
+import os
+import re
+import sqlite3
+import threading
+from functools import lru_cache
+from typing import Dict, Iterable, List, Optional, Tuple
+
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS documents (
+    id INTEGER PRIMARY KEY,
+    source TEXT NOT NULL,
+    doc_id TEXT NOT NULL,
+    title TEXT NOT NULL,
+    content_hash TEXT NOT NULL,
+    UNIQUE (source, doc_id)
+);
+CREATE VIRTUAL TABLE IF NOT EXISTS documents_fts USING fts5(
+    title, body, source UNINDEXED, tokenize = 'porter unicode61'
+);
+"""
+
+_STOPWORDS = {
+    "a", "an", "and", "are", "about", "as", "at", "be", "by", "can", "find", "for", "from", "how",
+    "in", "is", "it", "latest", "me", "of", "on", "or", "recent", "search", "the", "to", "what",
+    "which", "who", "with",
+}
+_WORD = re.compile(r"\w+", re.UNICODE)
+# bm25-ranked candidates fetched per requested hit before the term-coverage cutoff
+_CANDIDATES_PER_HIT = 10
+
+# Field names used by common dump extracts, in order of preference
+_ID_FIELDS = ("id", "doc_id", "arxiv_id", "pageid")
+_TITLE_FIELDS = ("title",)
+_BODY_FIELDS = ("text", "abstract", "body", "content")
+
+
+def _first(record: Dict, fields) -> Optional[str]:
+    for field in fields:
+        if record.get(field):
+            return str(record[field])
+    return None
+
+
+class LocalCorpus:
+    """On-disk full-text index answering wiki_search / arxiv_search without the network."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.executescript(_SCHEMA)
+
+    def import_records(self, source: str, records: Iterable[Dict]) -> Dict[str, int]:
+        """Add or refresh documents; returns counts of added, updated and unchanged records."""
+        counts = {"added": 0, "updated": 0, "unchanged": 0, "skipped": 0}
+        with self._lock, self._conn:
+            for record in records:
+                doc_id, body = _first(record, _ID_FIELDS), _first(record, _BODY_FIELDS)
+                if not doc_id or not body:
+                    counts["skipped"] += 1
+                    continue
+                title = _first(record, _TITLE_FIELDS) or doc_id
+                content_hash = hashlib.sha1(f"{title}\0{body}".encode("utf-8")).hexdigest()
+
+                row = self._conn.execute(
+                    "SELECT id, content_hash FROM documents WHERE source = ? AND doc_id = ?", (source, doc_id)
+                ).fetchone()
+                if row and row[1] == content_hash:
+                    counts["unchanged"] += 1
+                    continue
+                if row:
+                    self._conn.execute("DELETE FROM documents_fts WHERE rowid = ?", (row[0],))
+                    self._conn.execute(
+                        "UPDATE documents SET title = ?, content_hash = ? WHERE id = ?", (title, content_hash, row[0])
+                    )
+                    rowid = row[0]
+                    counts["updated"] += 1
+                else:
+                    rowid = self._conn.execute(
+                        "INSERT INTO documents (source, doc_id, title, content_hash) VALUES (?, ?, ?, ?)",
+                        (source, doc_id, title, content_hash),
+                    ).lastrowid
+                    counts["added"] += 1
+                self._conn.execute(
+                    "INSERT INTO documents_fts (rowid, title, body, source) VALUES (?, ?, ?, ?)",
+                    (rowid, title, body, source),
+                )
+        return counts
+
+    def import_jsonl(self, source: str, path: str) -> Dict[str, int]:
+        def records():
+            with open(path, "r", encoding="utf-8") as f:
+                for line in f:
+                    if line.strip():
+                        yield json.loads(line)
+        return self.import_records(source, records())
+
+    def search(self, source: str, query: str, limit: int = 3, min_coverage: Optional[float] = None) -> List[Tuple[str, str, float]]:
+        """Ranked (title, snippet, bm25 score) hits; [] on a miss.
+
+        Any query term may match and candidates are ranked by bm25, but a document only counts as a
+        hit when it contains at least `min_coverage` of the query terms. An extra word in a model's
+        query ("scrum framework overview") still hits, one shared word with an unrelated article doesn't.
+        """
+        if min_coverage is None:
+            from ..config.settings import LOCAL_CORPUS_MIN_COVERAGE
+            min_coverage = LOCAL_CORPUS_MIN_COVERAGE
+        terms = list(dict.fromkeys(t for t in _WORD.findall(query.lower()) if t not in _STOPWORDS))
+        if not terms:
+            return []
+        match = " OR ".join(f'"{term}"' for term in terms)
+        with self._lock:
+            candidates = self._conn.execute(
+                """
+                SELECT rowid, title, snippet(documents_fts, 1, '', '', ' ... ', 64), bm25(documents_fts, 5.0, 1.0) AS score
+                FROM documents_fts
+                WHERE documents_fts MATCH ? AND source = ?
+                ORDER BY score
+                LIMIT ?
+                """,
+                (match, source, limit * _CANDIDATES_PER_HIT),
+            ).fetchall()
+            if not candidates:
+                return []
+            # Count matched terms per candidate through FTS itself so stemming applies ("sprints" ~ "sprint")
+            rowids = [row[0] for row in candidates]
+            placeholders = ", ".join("?" * len(rowids))
+            covered: Dict[int, int] = dict.fromkeys(rowids, 0)
+            for term in terms:
+                for (rowid,) in self._conn.execute(
+                    f"SELECT rowid FROM documents_fts WHERE documents_fts MATCH ? AND rowid IN ({placeholders})",
+                    (f'"{term}"', *rowids),
+                ):
+                    covered[rowid] += 1
+        needed = max(1, math.ceil(min_coverage * len(terms)))
+        return [(title, snippet, score) for rowid, title, snippet, score in candidates if covered[rowid] >= needed][:limit]
+
+    def close(self):
+        self._conn.close()
+
+
+@lru_cache(maxsize=None)
+def _open_corpus(path: str) -> LocalCorpus:
+    return LocalCorpus(path)
+
+
+def get_local_corpus() -> Optional[LocalCorpus]:
+    """The configured local corpus, or None when local corpus mode is off."""
+    from ..config.settings import LOCAL_CORPUS_PATH
+    if not LOCAL_CORPUS_PATH or not os.path.exists(LOCAL_CORPUS_PATH):
+        return None
+    return _open_corpus(LOCAL_CORPUS_PATH)
+
+
+def format_hits(hits: List[Tuple[str, str, float]]) -> str:
+    return "\n\n---\n\n".join(f"\n{title}\n{snippet}\n" for title, snippet, _ in hits)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    import_parser = subparsers.add_parser("import", help="Import JSON-lines dump extracts")
+    import_parser.add_argument("--db", required=True)
+    import_parser.add_argument("--source", required=True, choices=["wikipedia", "arxiv"])
+    import_parser.add_argument("files", nargs="+")
+
+    search_parser = subparsers.add_parser("search", help="Query the index")
+    search_parser.add_argument("--db", required=True)
+    search_parser.add_argument("--source", required=True, choices=["wikipedia", "arxiv"])
+    search_parser.add_argument("--limit", type=int, default=3)
+    search_parser.add_argument("query")
+
+    args = parser.parse_args()
+    corpus = LocalCorpus(args.db)
+    if args.command == "import":
+        for path in args.files:
+            print(f"{path}: {corpus.import_jsonl(args.source, path)}")
+    else:
+        hits = corpus.search(args.source, args.query, args.limit)
+        print(format_hits(hits) if hits else "No local results.")
+    corpus.close()
+
+
+if __name__ == "__main__":
+    main()
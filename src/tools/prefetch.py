@@ -0,0 +1,184 @@
+import re
+import threading
+import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, Optional, Tuple
+
+from langchain_core.runnables import RunnableConfig
+from langchain_core.tools import StructuredTool
+
+from ..config.settings import PREFETCH_MATCH_THRESHOLD, PREFETCH_WORKERS
+
+
+_WORD = re.compile(r"\w+", re.UNICODE)
+# Words that say "search" without saying what for; dropped before predicting and matching queries
+_FILLER = {
+    "a", "about", "an", "and", "any", "are", "can", "do", "find", "for", "from", "give", "in", "info",
+    "information", "is", "latest", "look", "me", "new", "newest", "of", "on", "please", "recent", "research",
+    "search", "show", "some", "the", "there", "to", "up", "what", "whats", "which", "who", "with", "you",
+}
+_SEARCH_INTENT = re.compile(r"\b(search|find|look up|latest|recent|trends?|papers?|studies|arxiv|wikipedia|what is|who is|who was)\b", re.I)
+# Memory updates mention research too ("add to our research notes ..."); those never search first
+_UPDATE_INTENT = re.compile(r"\b(create|add|update|remember|note that|ticket|feedback|my name|i'm|i am|from now on)\b", re.I)
+_ARXIV = re.compile(r"\b(papers?|arxiv|preprints?|publications?)\b", re.I)
+_WIKI = re.compile(r"\b(wikipedia|what is|who is|who was|definition of|history of)\b", re.I)
+
+
+def _terms(text: str) -> set:
+    return {word for word in _WORD.findall(text.lower()) if word not in _FILLER}
+
+
+def predict_search(message: str) -> Optional[Tuple[str, str]]:
+    """Guess (tool name, query) for a message the model is likely to answer with a search."""
+    if not _SEARCH_INTENT.search(message) or _UPDATE_INTENT.search(message):
+        return None
+    terms = [word for word in _WORD.findall(message.lower()) if word not in _FILLER]
+    if not terms:
+        return None
+    if _ARXIV.search(message):
+        tool_name = "arxiv_search"
+    elif _WIKI.search(message):
+        tool_name = "wiki_search"
+    else:
+        tool_name = "web_search"
+    return tool_name, " ".join(terms)
+
+
+def queries_match(predicted: str, actual: str, threshold: float = PREFETCH_MATCH_THRESHOLD) -> bool:
+    predicted_terms, actual_terms = _terms(predicted), _terms(actual)
+    if not predicted_terms or not actual_terms:
+        return False
+    return len(predicted_terms & actual_terms) / len(predicted_terms | actual_terms) >= threshold
+
+
+class _Prefetch:
+    __slots__ = ("tool_name", "query", "future", "started")
+
+    def __init__(self, tool_name, query, future, started):
+        self.tool_name = tool_name
+        self.query = query
+        self.future = future
+        self.started = started
+
+
+class SearchPrefetcher:
+    """Starts a predicted search while decide_initial_action is still waiting on the model.
+
+    If the model then calls the same tool with a matching query, the search node takes
+    the prefetched result; otherwise the prefetch is cancelled (or its result dropped).
+    """
+
+    def __init__(self, tools, workers: int = PREFETCH_WORKERS):
+        self.tools = {tool.name: tool for tool in tools}
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="search-prefetch")
+        self._lock = threading.Lock()
+        self._pending: Dict[Tuple[str, str], _Prefetch] = {}
+        self._counts = defaultdict(int)
+        self._saved_seconds = 0.0
+
+    def start(self, key: Tuple[str, str], message: str) -> bool:
+        """Predict and launch a search for this turn; returns whether one was started."""
+        prediction = predict_search(message)
+        if prediction is None or prediction[0] not in self.tools:
+            return False
+        tool_name, query = prediction
+
+        def run():
+            started = time.perf_counter()
+            return self.tools[tool_name].invoke({"query": query}), time.perf_counter() - started
+
+        with self._lock:
+            stale = self._pending.pop(key, None)
+            if stale is not None:
+                self._cancel(stale)
+                self._counts["missed"] += 1
+            self._pending[key] = _Prefetch(tool_name, query, self._executor.submit(run), time.perf_counter())
+            self._counts["started"] += 1
+        return True
+
+    def claim(self, key: Tuple[str, str], tool_name: str, query: str) -> Optional[Any]:
+        """The prefetched result if it answers this tool call, else None.
+
+        A prefetch for the same tool with a different query is dropped.
+        """
+        with self._lock:
+            prefetch = self._pending.get(key)
+            # Left in place for another tool call of the same message
+            if prefetch is None or prefetch.tool_name != tool_name:
+                return None
+            del self._pending[key]
+        if not queries_match(prefetch.query, query):
+            self._cancel(prefetch)
+            self._record("missed")
+            return None
+
+        claimed = time.perf_counter()
+        try:
+            result, elapsed = prefetch.future.result()
+        except Exception:
+            # A failed prefetch costs nothing extra: the caller runs the search itself
+            self._record("failed")
+            return None
+        # Time the search had already run in the background when the tool call arrived
+        saved = min(elapsed, claimed - prefetch.started)
+        self._record("hit", saved)
+        return result
+
+    def discard(self, key: Tuple[str, str], outcome: str = "unused"):
+        """Drop this turn's prefetch, if still unclaimed: "unused" when the model answered
+        without searching, "missed" when it searched with a different tool."""
+        with self._lock:
+            prefetch = self._pending.pop(key, None)
+        if prefetch is not None:
+            self._cancel(prefetch)
+            self._record(outcome)
+
+    def _cancel(self, prefetch: Optional[_Prefetch]):
+        if prefetch is not None:
+            # Already running searches finish in the background; their result is ignored
+            prefetch.future.cancel()
+
+    def _record(self, outcome: str, saved: float = 0.0):
+        with self._lock:
+            self._counts[outcome] += 1
+            self._saved_seconds += saved
+
+    def stats(self) -> Dict[str, float]:
+        with self._lock:
+            counts = dict(self._counts)
+            decided = sum(counts.get(k, 0) for k in ("hit", "missed", "unused", "failed"))
+            return {
+                **counts,
+                "hit_rate": counts.get("hit", 0) / decided if decided else 0.0,
+                "saved_seconds": self._saved_seconds,
+                "saved_per_hit": self._saved_seconds / counts["hit"] if counts.get("hit") else 0.0,
+            }
+
+    def close(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+
+def prefetch_key(config: RunnableConfig) -> Tuple[str, str]:
+    configurable = config["configurable"]
+    return configurable["user_id"], configurable["thread_id"]
+
+
+def prefetching_tools(tools, prefetcher: SearchPrefetcher):
+    """Wrap search tools so a tool call uses the turn's prefetched result when it matches."""
+
+    def make_wrapper(tool):
+        def run(config: RunnableConfig, **tool_input):
+            result = prefetcher.claim(prefetch_key(config), tool.name, tool_input.get("query", ""))
+            if result is not None:
+                return result
+            return tool.invoke(tool_input)
+
+        return StructuredTool.from_function(
+            func=run,
+            name=tool.name,
+            description=tool.description,
+            args_schema=tool.args_schema,
+        )
+
+    return [make_wrapper(tool) for tool in tools]
@@ -1,7 +1,28 @@
+from functools import lru_cache
 from typing import Dict, List, Any
 from langchain_core.tools import tool
 from langchain_community.tools.tavily_search import TavilySearchResults
-from langchain_community.document_loaders import WikipediaLoader, ArxivLoader
+from langchain_community.utilities import ArxivAPIWrapper, WikipediaAPIWrapper
+
+from .local_corpus import get_local_corpus, format_hits
+
+
+# Clients are built once per process and shared by all queries; building one validates
+# the environment and imports the client library, which the loaders redid per query
+@lru_cache(maxsize=None)
+def _tavily_client() -> TavilySearchResults:
+    return TavilySearchResults(max_results=3)
+
+
+@lru_cache(maxsize=None)
+def _wikipedia_client() -> WikipediaAPIWrapper:
+    # Same settings WikipediaLoader(load_max_docs=2) used
+    return WikipediaAPIWrapper(top_k_results=2, doc_content_chars_max=4000)
+
+
+@lru_cache(maxsize=None)
+def _arxiv_client() -> ArxivAPIWrapper:
+    return ArxivAPIWrapper(load_max_docs=3, doc_content_chars_max=None)
 
 
 @tool
@@ -11,7 +32,7 @@ def web_search(query: str) -> Dict[str, str]:
     Args:
         query: The search query.
     """
-    tavily_tool = TavilySearchResults(max_results=3)
+    tavily_tool = _tavily_client()
     # Invoke the Tavily tool correctly. It expects the query as the 'input'.
     search_results_list_of_dicts = tavily_tool.invoke(input=query)
 
@@ -37,7 +58,14 @@ def wiki_search(query: str) -> Dict[str, str]:
     Args:
         query: The search query.
     """
-    search_docs: List[Any] = WikipediaLoader(query=query, load_max_docs=2).load()
+    # Answer from the offline index when configured; fall back to the network on a miss
+    corpus = get_local_corpus()
+    if corpus is not None:
+        hits = corpus.search("wikipedia", query, limit=2)
+        if hits:
+            return {"wiki_results": format_hits(hits)}
+
+    search_docs: List[Any] = _wikipedia_client().load(query)
     formatted_search_docs = "\n\n---\n\n".join(
         [
             f'\n{doc.page_content}\n'
@@ -53,7 +81,13 @@ def arxiv_search(query: str) -> Dict[str, str]:
     Args:
         query: The search query.
     """
-    search_docs: List[Any] = ArxivLoader(query=query, load_max_docs=3).load()
+    corpus = get_local_corpus()
+    if corpus is not None:
+        hits = corpus.search("arxiv", query, limit=3)
+        if hits:
+            return {"arxiv_results": format_hits(hits)}
+
+    search_docs: List[Any] = _arxiv_client().load(query)
     formatted_search_docs = "\n\n---\n\n".join(
         [
             f'\n{doc.page_content[:2000]}\n'  # Increased snippet size
@@ -0,0 +1,77 @@
+import json
+import os
+
+from src.config import settings
+from src.tools import search_tools
+from src.tools.local_corpus import LocalCorpus
+
+CORPUS_DIR = os.path.join(os.path.dirname(__file__), "..", "examples", "corpus")
+WIKIPEDIA = os.path.join(CORPUS_DIR, "wikipedia_sample.jsonl")
+ARXIV = os.path.join(CORPUS_DIR, "arxiv_sample.jsonl")
+
+
+def _build(path):
+    corpus = LocalCorpus(str(path))
+    corpus.import_jsonl("wikipedia", WIKIPEDIA)
+    corpus.import_jsonl("arxiv", ARXIV)
+    return corpus
+
+
+def test_reimport_only_rewrites_changed_documents(tmp_path):
+    corpus = _build(tmp_path / "corpus.db")
+    with open(WIKIPEDIA, encoding="utf-8") as f:
+        records = [json.loads(line) for line in f if line.strip()]
+    records[0]["text"] += " Scrum teams also track velocity across sprints."
+
+    counts = corpus.import_records("wikipedia", records)
+
+    assert counts == {"added": 0, "updated": 1, "unchanged": len(records) - 1, "skipped": 0}
+    assert corpus.search("wikipedia", "velocity")[0][0] == "Scrum (software development)"
+
+
+def test_search_ranks_title_matches_first_and_keeps_sources_apart(tmp_path):
+    corpus = _build(tmp_path / "corpus.db")
+    corpus.import_records("wikipedia", [{
+        "id": "1004", "title": "Lean software development",
+        "text": "Lean software development borrows practices such as kanban boards from lean manufacturing.",
+    }])
+
+    hits = corpus.search("wikipedia", "what is kanban")
+    assert [title for title, _, _ in hits] == ["Kanban (development)", "Lean software development"]
+    assert corpus.search("arxiv", "remote developer productivity")[0][0] == "Measuring Developer Productivity in Remote Teams"
+    assert corpus.search("arxiv", "kanban") == []
+
+
+def test_llm_phrased_queries_with_extra_words_still_hit(tmp_path):
+    corpus = _build(tmp_path / "corpus.db")
+
+    for query in ("scrum framework overview", "Scrum methodology", "overview of the Scrum framework for agile teams"):
+        assert corpus.search("wikipedia", query)[0][0] == "Scrum (software development)"
+    # One shared word is not enough to answer locally
+    assert corpus.search("wikipedia", "kanban quantum field theory") == []
+
+
+class _NetworkLoader:
+    def __init__(self):
+        self.queries = []
+
+    def load(self, query):
+        self.queries.append(query)
+        return []
+
+
+def test_tools_fall_back_to_the_network_only_on_a_miss(tmp_path, monkeypatch):
+    _build(tmp_path / "corpus.db").close()
+    monkeypatch.setattr(settings, "LOCAL_CORPUS_PATH", str(tmp_path / "corpus.db"))
+    wikipedia, arxiv = _NetworkLoader(), _NetworkLoader()
+    monkeypatch.setattr(search_tools, "_wikipedia_client", lambda: wikipedia)
+    monkeypatch.setattr(search_tools, "_arxiv_client", lambda: arxiv)
+
+    hit = search_tools.wiki_search.invoke({"query": "scrum sprint planning"})
+    assert "Scrum (software development)" in hit["wiki_results"]
+    assert wikipedia.queries == []
+
+    search_tools.wiki_search.invoke({"query": "quantum chromodynamics"})
+    search_tools.arxiv_search.invoke({"query": "quantum chromodynamics"})
+    assert wikipedia.queries == ["quantum chromodynamics"]
+    assert arxiv.queries == ["quantum chromodynamics"]
@@ -0,0 +1,58 @@
+from datetime import datetime
+
+import pytest
+from langchain_core.messages import HumanMessage
+from langgraph.store.memory import InMemoryStore
+
+from src.nodes.query_nodes import parse_ticket_query, route_from_start
+
+LISTING = [
+    "Show me my tickets",
+    "Show me my current tickets.",
+    "Show me my current ticket list.",
+    "List all my open tasks due this week",
+    "Can you show me my backlog?",
+    "What are my open tickets?",
+    "What's overdue this week?",
+    "What is due today?",
+    "Which of my tickets are overdue?",
+    "How many tickets do I have?",
+]
+
+NOT_LISTING = [
+    "What tasks are blocking the release?",
+    "Which tickets relate to authentication?",
+    "How many tasks does a typical sprint contain?",
+    "What do you know about tasks in Kanban?",
+    "Show me the latest research on task management tools",
+    "Create a ticket to review my open tasks",
+    "Which tasks should I focus on this week?",
+]
+
+
+@pytest.mark.parametrize("text", LISTING)
+def test_explicit_listing_requests_use_the_table(text):
+    assert parse_ticket_query(text) is not None
+
+
+@pytest.mark.parametrize("text", NOT_LISTING)
+def test_other_questions_go_to_the_model(text):
+    assert parse_ticket_query(text) is None
+
+
+def test_filters():
+    now = datetime(2026, 10, 14, 9, 30)  # a Wednesday
+    assert parse_ticket_query("What's overdue this week?", now)["overdue"] is True
+    assert parse_ticket_query("What's overdue this week?", now)["due_before"] == datetime(2026, 10, 19)
+    assert parse_ticket_query("Show me all my tickets")["statuses"] is None
+    assert parse_ticket_query("List my done tasks")["statuses"] == ("done",)
+
+
+def test_users_with_ticket_instructions_get_the_model():
+    store = InMemoryStore()
+    state = {"messages": [HumanMessage(content="Show me my tickets")]}
+    config = {"configurable": {"user_id": "u1", "thread_id": "t1"}}
+    assert route_from_start(state, config, store) == "answer_ticket_query"
+
+    store.put(("instructions", "u1"), "instructions", {"memory": "Always group tickets by project."})
+    assert route_from_start(state, config, store) == "decide_initial_action"
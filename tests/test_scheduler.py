@@ -0,0 +1,23 @@
+from src.models.scheduler import BACKGROUND, BULK, INTERACTIVE, LLMScheduler, _Waiter
+
+
+def _waiter(scheduler, priority, enqueued, seq):
+    return _Waiter(priority, enqueued, enqueued + scheduler.deadlines[priority], seq)
+
+
+def test_promoted_call_runs_before_later_calls_of_its_new_class():
+    scheduler = LLMScheduler(max_concurrency=1, aging_seconds=10.0,
+                             deadlines={INTERACTIVE: 2.0, BACKGROUND: 30.0, BULK: 300.0})
+    aged_bulk = _waiter(scheduler, BULK, enqueued=0.0, seq=0)
+    fresh_background = _waiter(scheduler, BACKGROUND, enqueued=14.0, seq=1)
+    now = 15.0
+
+    # Both are effectively background; the bulk call has waited longest
+    assert scheduler._key(aged_bulk, now)[0] == scheduler._key(fresh_background, now)[0]
+    assert min([fresh_background, aged_bulk], key=lambda w: scheduler._key(w, now)) is aged_bulk
+
+
+def test_unpromoted_call_keeps_its_own_deadline():
+    scheduler = LLMScheduler(max_concurrency=1, aging_seconds=10.0)
+    waiter = _waiter(scheduler, BULK, enqueued=0.0, seq=0)
+    assert scheduler._key(waiter, 5.0) == (2, waiter.deadline, 0)
@@ -0,0 +1,82 @@
+import pytest
+
+from src.memory.ticket_dedup import TicketIndex
+
+EXISTING = [
+    "Fix login bug on iOS",
+    "Investigate new CRM options",
+    "Prepare Q3 board deck",
+    "Schedule quarterly team reviews",
+    "Migrate billing service to Postgres",
+    "Research competitor pricing strategies",
+    "Update onboarding docs for new hires",
+]
+
+# Same task, restated: should merge into the existing ticket
+RESTATED = [
+    ("Please fix the login bug on iOS asap", "Fix login bug on iOS"),
+    ("Create a ticket to fix the iOS login bugs", "Fix login bug on iOS"),
+    ("Schedule the quarterly team reviews again", "Schedule quarterly team reviews"),
+    ("We need to migrate the billing service to Postgres", "Migrate billing service to Postgres"),
+    ("Competitor pricing strategies need more research", "Research competitor pricing strategies"),
+    ("Fix the iOS login bug before the release", "Fix login bug on iOS"),
+]
+
+# Near misses that differ in a content word: separate tickets
+NEAR_MISSES = [
+    "Fix login bug on Android",
+    "Fix signup bug on iOS",
+    "Fix login crash on iOS",
+    "Prepare Q4 board deck",
+    "Prepare Q3 sales deck",
+    "Schedule quarterly team offsites",
+    "Schedule weekly team reviews",
+    "Migrate billing service to MySQL",
+    "Migrate auth service to Postgres",
+    "Research competitor hiring strategies",
+    "Update onboarding docs for new managers",
+    "Review competitor pricing strategies",
+    "Investigate new ERP options",
+]
+
+
+@pytest.fixture
+def index():
+    index = TicketIndex()
+    index.add_many((task, task) for task in EXISTING)
+    return index
+
+
+@pytest.mark.parametrize("restated, original", RESTATED)
+def test_restated_tickets_merge(index, restated, original):
+    match = index.match(restated)
+    assert match is not None and match[0] == original
+
+
+@pytest.mark.parametrize("text", NEAR_MISSES)
+def test_near_misses_stay_separate(index, text):
+    assert index.match(text) is None
+
+
+def test_short_tasks_never_merge(index):
+    index.add("short", "CRM options")
+    assert index.match("CRM options") is None
+
+
+def _large_backlog():
+    """The fixture tickets plus many where "research" and "review" are everyday verbs."""
+    index = TicketIndex()
+    index.add_many((f"{verb}-{i}", f"{verb} vendor contract {i}") for i in range(40) for verb in ("Research", "Review"))
+    index.add_many((task, task) for task in EXISTING)
+    return index
+
+
+def test_swapping_words_common_in_the_backlog_merges():
+    match = _large_backlog().match("Review competitor pricing strategies")
+    assert match is not None and match[0] == "Research competitor pricing strategies"
+
+
+def test_swapping_a_rare_word_stays_separate_in_a_large_backlog():
+    index = _large_backlog()
+    assert index.match("Fix login bug on Android") is None
+    assert index.match("Review competitor hiring strategies") is None
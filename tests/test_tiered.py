@@ -0,0 +1,99 @@
+import time
+
+from langchain_core.messages import AIMessage, HumanMessage
+from langgraph.graph import END, START, MessagesState, StateGraph
+
+from src.memory.snapshot import LazySnapshotStore, pack
+from src.memory.tiered import IndexedMemorySaver, TieredMemory
+
+
+def _echo_graph(store, saver):
+    def echo(state: MessagesState, config, store):
+        user_id = config["configurable"]["user_id"]
+        store.put(("profile", user_id), "profile", {"last": state["messages"][-1].content})
+        return {"messages": [AIMessage(content="ok")]}
+
+    builder = StateGraph(MessagesState)
+    builder.add_node("echo", echo)
+    builder.add_edge(START, "echo")
+    builder.add_edge("echo", END)
+    return builder.compile(checkpointer=saver, store=store)
+
+
+def test_store_keeps_namespace_sizes_up_to_date():
+    store = LazySnapshotStore()
+    namespace = ("ticket", "u1")
+    store.put(namespace, "a", {"task": "Draft the roadmap"})
+    store.put(namespace, "b", {"task": "Review pricing"})
+    store.put(namespace, "a", {"task": "Draft the Q3 roadmap"})
+    store.delete(namespace, "b")
+
+    assert store.namespace_bytes([namespace]) == len("a") + len(pack({"task": "Draft the Q3 roadmap"}))
+
+
+def test_spilled_user_reloads_with_memory_and_threads(tmp_path):
+    store, saver = LazySnapshotStore(), IndexedMemorySaver()
+    graph = _echo_graph(store, saver)
+    tiered = TieredMemory(store, saver, str(tmp_path), max_bytes=2**30)
+    config = {"configurable": {"thread_id": "t1", "user_id": "u1"}}
+
+    with tiered.user("u1", "t1"):
+        graph.invoke({"messages": [HumanMessage(content="hello")]}, config)
+    resident_bytes = tiered.stats()["resident_bytes"]
+    assert resident_bytes > 0
+
+    assert tiered.evict("u1")
+    assert store.get(("profile", "u1"), "profile") is None
+    assert saver.get_tuple(config) is None
+    assert tiered.stats()["resident_bytes"] == 0
+
+    with tiered.user("u1", "t1"):
+        assert store.get(("profile", "u1"), "profile").value == {"last": "hello"}
+        assert [m.content for m in graph.get_state(config).values["messages"]] == ["hello", "ok"]
+    assert tiered.stats()["resident_bytes"] == resident_bytes
+
+
+def test_reloaded_user_keeps_spill_file_until_a_snapshot_includes_them(tmp_path):
+    spill_dir, snapshot_path = tmp_path / "spill", str(tmp_path / "memory.snapshot")
+    store, saver = LazySnapshotStore(), IndexedMemorySaver()
+    graph = _echo_graph(store, saver)
+    tiered = TieredMemory(store, saver, str(spill_dir), max_bytes=2**30, keep_until_snapshot=True)
+    config = {"configurable": {"thread_id": "t1", "user_id": "u1"}}
+
+    with tiered.user("u1", "t1"):
+        graph.invoke({"messages": [HumanMessage(content="hello")]}, config)
+    tiered.evict("u1")
+    with tiered.user("u1", "t1"):
+        pass
+    assert (spill_dir / "u1.spill").exists()
+
+    # A crash now restarts from the spill file rather than losing the user
+    restarted = LazySnapshotStore(snapshot_path)
+    restarted_tiered = TieredMemory(restarted, IndexedMemorySaver(), str(spill_dir), max_bytes=2**30, keep_until_snapshot=True)
+    with restarted_tiered.user("u1"):
+        assert restarted.get(("profile", "u1"), "profile").value == {"last": "hello"}
+    assert (spill_dir / "u1.spill").exists()
+
+    started = time.monotonic()
+    store.snapshot(snapshot_path)
+    tiered.snapshot_written(started)
+    assert not (spill_dir / "u1.spill").exists()
+    assert LazySnapshotStore(snapshot_path).get(("profile", "u1"), "profile").value == {"last": "hello"}
+
+
+def test_adopted_user_is_not_overwritten_by_a_leftover_spill_file(tmp_path):
+    store, saver = LazySnapshotStore(), IndexedMemorySaver()
+    graph = _echo_graph(store, saver)
+    tiered = TieredMemory(store, saver, str(tmp_path), max_bytes=2**30)
+    config = {"configurable": {"thread_id": "t1", "user_id": "u1"}}
+    with tiered.user("u1", "t1"):
+        graph.invoke({"messages": [HumanMessage(content="old")]}, config)
+    tiered.evict("u1")
+
+    # The user comes back from another worker with newer data
+    store.import_namespaces([[["profile", "u1"], [["profile", {"last": "new"}, None, None]]]])
+    tiered.adopt("u1", [])
+
+    assert store.get(("profile", "u1"), "profile").value == {"last": "new"}
+    assert not (tmp_path / "u1.spill").exists()
+    assert tiered.users() == {"u1": set()}
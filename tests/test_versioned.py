@@ -0,0 +1,53 @@
+from langchain_core.messages import AIMessage, HumanMessage
+from langgraph.store.memory import InMemoryStore
+
+from src.memory.versioned import compare_and_put, get_versioned, write_stats
+from src.nodes.update_nodes import update_generic_memory
+
+
+def test_compare_and_put_rejects_stale_version():
+    store = InMemoryStore()
+    namespace = ("instructions", "u1")
+    _, version = get_versioned(store, namespace, "instructions")
+
+    assert compare_and_put(store, namespace, "instructions", {"memory": "first"}, version)
+    assert not compare_and_put(store, namespace, "instructions", {"memory": "stale"}, version)
+    assert store.get(namespace, "instructions").value == {"memory": "first"}
+
+
+class _RacingModel:
+    """Rewrites memory, letting another writer commit during its first call."""
+
+    def __init__(self, store, namespace):
+        self.store = store
+        self.namespace = namespace
+        self.prompts = []
+
+    def invoke(self, messages):
+        self.prompts.append(messages[0].content)
+        if len(self.prompts) == 1:
+            _, version = get_versioned(self.store, self.namespace, "instructions")
+            compare_and_put(self.store, self.namespace, "instructions", {"memory": "concurrent"}, version)
+        return AIMessage(content=f"rewrite {len(self.prompts)}")
+
+
+def test_generic_memory_update_retries_on_the_fresh_version():
+    write_stats.reset()
+    store = InMemoryStore()
+    namespace = ("instructions", "u1")
+    model = _RacingModel(store, namespace)
+    state = {"messages": [
+        HumanMessage(content="Always add deadlines to tickets."),
+        AIMessage(content="", tool_calls=[{"name": "UpdateMemory", "args": {"update_type": "instructions"}, "id": "call-1"}]),
+    ]}
+    config = {"configurable": {"user_id": "u1", "thread_id": "t1"}}
+
+    result = update_generic_memory(state, config, store, model, "instructions",
+                                   "{current_instructions}|{relevant_user_input}")
+
+    assert len(model.prompts) == 2
+    # The retry is prompted with the concurrent writer's content, and its rewrite wins
+    assert model.prompts[1].startswith("concurrent|")
+    assert store.get(namespace, "instructions").value == {"memory": "rewrite 2"}
+    assert "has been updated" in result["messages"][0].content
+    assert write_stats.snapshot()["instructions"] == {"committed": 2, "conflict": 1}
@@ -0,0 +1,99 @@
+import time
+
+import pytest
+from langchain_core.messages import AIMessage
+
+from src.memory.snapshot import LazySnapshotStore
+from src.memory.tiered import IndexedMemorySaver
+from src.serving.worker_pool import HashRing, WorkerPool
+
+
+class _CountingGraph:
+    """Stands in for ManagerAIGraph: counts each user's turns in the store."""
+
+    def __init__(self):
+        self.across_thread_memory = LazySnapshotStore()
+        self.within_thread_memory = IndexedMemorySaver()
+        self.tiered_memory = None
+
+    def invoke(self, input_data, config):
+        namespace = ("profile", config["configurable"]["user_id"])
+        item = self.across_thread_memory.get(namespace, "turns")
+        turns = (item.value["count"] if item else 0) + 1
+        self.across_thread_memory.put(namespace, "turns", {"count": turns})
+        return {"messages": [AIMessage(content=str(turns))]}
+
+
+def counting_graph(worker_id=None):
+    return _CountingGraph()
+
+
+def _refuse_imports(sections):
+    raise RuntimeError("import failed")
+
+
+def counting_graph_refusing_imports_after_first(worker_id=None):
+    graph = _CountingGraph()
+    if worker_id:
+        graph.across_thread_memory.import_namespaces = _refuse_imports
+    return graph
+
+
+USERS = [f"user-{i}" for i in range(40)]
+
+
+def test_adding_a_node_only_moves_keys_to_it():
+    ring = HashRing([0, 1, 2])
+    before = {user: ring.node_for(user) for user in USERS * 5}
+    ring.add(3)
+    for user, owner in before.items():
+        assert ring.node_for(user) in (owner, 3)
+
+
+def test_users_keep_their_memory_across_rebalancing():
+    pool = WorkerPool(1, graph_factory=counting_graph, threads_per_worker=2)
+    try:
+        for user in USERS:
+            assert pool.invoke(user, "t", "hi") == "1"
+        new_worker = pool.add_worker()
+        assert any(pool.ring.node_for(user) == new_worker for user in USERS)
+        for user in USERS:
+            assert pool.invoke(user, "t", "hi") == "2"
+        pool.remove_worker(0)
+        for user in USERS:
+            assert pool.invoke(user, "t", "hi") == "3"
+    finally:
+        pool.close()
+
+
+def test_failed_import_leaves_users_on_their_old_worker():
+    pool = WorkerPool(1, graph_factory=counting_graph_refusing_imports_after_first, threads_per_worker=2)
+    try:
+        for user in USERS:
+            pool.invoke(user, "t", "hi")
+        with pytest.raises(RuntimeError):
+            pool.add_worker()
+        assert list(pool.workers) == [0]
+        for user in USERS:
+            assert pool.invoke(user, "t", "hi") == "2"
+    finally:
+        pool.close()
+
+
+def test_dead_worker_fails_its_requests_and_is_restarted():
+    pool = WorkerPool(1, graph_factory=counting_graph, threads_per_worker=2)
+    try:
+        assert pool.invoke("user-0", "t", "hi") == "1"
+        worker = pool.workers[0]
+        worker.process.kill()
+        worker.process.join()
+        # Requests to the dead process fail instead of hanging
+        with pytest.raises(RuntimeError):
+            pool._send(worker, "ping", None).result(timeout=10)
+        deadline = time.monotonic() + 10
+        while pool.workers[0] is worker and time.monotonic() < deadline:
+            time.sleep(0.01)
+        # The replacement starts empty: in-memory users died with the process
+        assert pool.invoke("user-0", "t", "hi", timeout=30) == "1"
+    finally:
+        pool.close()